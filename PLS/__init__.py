@@ -0,0 +1,29 @@
+"""PLS regression using the SIMPLS algorithm, in memory or via the filesystem.
+
+Submodules are only imported when first used, so that scoring with a saved model (load_model and predict) imports
+nothing beyond numpy. Fitting with PLS.main.pls imports the fitting code as before.
+
+"""
+
+import importlib
+
+__all__ = ["center_and_store", "diagnostics", "dot_product", "early_stopping", "file_cache", "line_counter", "main",
+           "model_io", "output_arrays", "partition_dataset", "serve", "shard_worker", "simpls", "sparsify",
+           "load_model", "predict", "save_model"]
+
+# The functions available directly from the package, and the submodules they are defined in.
+lazyFunctions = {"load_model": "model_io", "predict": "model_io", "save_model": "model_io"}
+
+
+def __getattr__(name):
+    """Import submodules (and the functions defined in them) on first use."""
+
+    if name in lazyFunctions:
+        return getattr(importlib.import_module("PLS." + lazyFunctions[name]), name)
+    if name in __all__:
+        return importlib.import_module("PLS." + name)
+    raise AttributeError("module 'PLS' has no attribute '{0:s}'".format(name))
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
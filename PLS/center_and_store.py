@@ -1,36 +1,214 @@
-def center_and_store(matrix, fileMatrix, fileMatrixTranspose):
+import multiprocessing
+import numpy
+import os
+from scipy import sparse
+import tempfile
+
+
+def center_and_store(matrix, fileMatrix, fileMatrixTranspose, memoryLimit=2**28, isParallel=None):
     """Center a matrix and save the result.
 
     Normally centering a matrix will cause a sparse matrix to become dense.
     This method will center and store a matrix (thereby causing it to become dense) without ever keeping the
     entire matrix in memory.
 
+    The matrix is read in blocks of rows, with only one dense block in memory at a time. The centered matrix is
+    written one block of rows at a time, while the transpose is written via an external memory transpose (see
+    write_centered_columns). When more than one CPU is available, the two files are written in parallel, with the
+    centered matrix written by a separate process (forked, so that the matrix is shared rather than copied).
+
     :param matrix:                  The matrix to be centered and stored
     :type matrix:                   numpy/scipy 2D array or matrix (or similar type exposing shape, mean and with indexing)
     :param fileMatrix:              The location to save the centered matrix
     :type fileMatrix:               string
     :param fileMatrixTranspose:     The location to save the transpose of the centered matrix
     :type fileMatrixTranspose:      string
+    :param memoryLimit:             The approximate number of bytes that each writer may use for its dense blocks.
+    :type memoryLimit:              int
+    :param isParallel:              Whether to write the centered matrix in a separate process. Defaults to doing so
+                                    only when more than one CPU is available and processes can be forked.
+    :type isParallel:               bool or None
+    :return :                       The total sum of squares of the centered matrix (accumulated while it is saved).
+    :rtype :                        float
 
     """
 
-    # Calculate the mean of the matri's columns.
-    matrixMean = matrix.mean(axis=0)
+    # Slicing rows from a CSR matrix only touches the nonzero values in those rows, so use that format for all sparse matrices.
+    if sparse.issparse(matrix):
+        matrix = matrix.tocsr()
 
-    # Determine whether to save the centered matrix so that one row is on each line of the file or one so that
-    # one column is on each line of the file. This will be done based on which dimension is smallest.
+    # Calculate the mean of the matrix's columns.
+    matrixMean = numpy.asarray(matrix.mean(axis=0)).ravel()
+
+    # Determine the number of rows in each block. Each block is centered in place, and the transpose is written from a
+    # transposed copy of it, so each element takes at most 16 bytes.
     [numRows, numCols] = matrix.shape
+    rowsPerBlock = max(1, memoryLimit // (16 * max(numCols, 1)))
+
+    # The row writer relies on fork to share the matrix with the parent. Other start methods would pickle the whole
+    # matrix to send it to the new process, so the rows are only written in parallel by default when fork is available.
+    isForkAvailable = "fork" in multiprocessing.get_all_start_methods()
+    if isParallel is None:
+        isParallel = isForkAvailable and (multiprocessing.cpu_count() > 1)
+    if isParallel:
+        # Save the matrix with a row on each line in a separate process, while the transpose is saved here.
+        context = multiprocessing.get_context("fork" if isForkAvailable else None)
+        rowWriter = context.Process(target=write_centered_rows, args=(matrix, matrixMean, fileMatrix, rowsPerBlock))
+        rowWriter.start()
+        try:
+            sumSquares = write_centered_columns(matrix, matrixMean, fileMatrixTranspose, rowsPerBlock)
+        except BaseException:
+            rowWriter.terminate()  # Don't leave the row writer running once the transpose has failed.
+            raise
+        finally:
+            rowWriter.join()
+        if rowWriter.exitcode != 0:
+            raise RuntimeError("Saving the centered matrix to {0:s} failed.".format(fileMatrix))
+    else:
+        write_centered_rows(matrix, matrixMean, fileMatrix, rowsPerBlock)
+        sumSquares = write_centered_columns(matrix, matrixMean, fileMatrixTranspose, rowsPerBlock)
+
+    return sumSquares
+
+
+def centered_blocks(matrix, matrixMean, rowsPerBlock):
+    """Generate the centered matrix one dense block of rows at a time.
+
+    :param matrix:          The matrix to be centered
+    :type matrix:           numpy/scipy 2D array or matrix
+    :param matrixMean:      The mean of the matrix's columns
+    :type matrixMean:       numpy array
+    :param rowsPerBlock:    The number of rows in each block
+    :type rowsPerBlock:     int
+    :return :               Generator of the centered blocks.
+    :rtype :                generator of numpy 2D arrays
+
+    """
+
+    numRows = matrix.shape[0]
+    for i in range(0, numRows, rowsPerBlock):
+        block = matrix[i:i + rowsPerBlock]
+        if sparse.issparse(block):
+            block = block.toarray().astype(numpy.float64, copy=False)
+        else:
+            block = numpy.array(block, dtype=numpy.float64)  # Copied, so that centering leaves the matrix unchanged.
+        block -= matrixMean  # Center in place, so that only one dense copy of the block exists.
+        yield block
+
+
+def write_rows(array, fileWriter):
+    """Write a 2D array to an open file with one row on each line.
+
+    :param array:           The array to write.
+    :type array:            numpy 2D array
+    :param fileWriter:      The file to write to.
+    :type fileWriter:       file object
+
+    """
+
+    for i in array:
+        i.tofile(fileWriter, sep='\t')
+        fileWriter.write('\n')
+
+
+def write_centered_rows(matrix, matrixMean, fileMatrix, rowsPerBlock):
+    """Save the centered matrix with a row on each line.
+
+    :param matrix:          The matrix to be centered and stored
+    :type matrix:           numpy/scipy 2D array or matrix
+    :param matrixMean:      The mean of the matrix's columns
+    :type matrixMean:       numpy array
+    :param fileMatrix:      The location to save the centered matrix
+    :type fileMatrix:       string
+    :param rowsPerBlock:    The number of rows to center at a time
+    :type rowsPerBlock:     int
+
+    """
+
     with open(fileMatrix, 'w') as writeMatrix:
-        # Save the matrix with a row on each line.
-        for i in range(numRows):
-            centeredRow = matrix[i, :] - matrixMean  # Center the row.
-            centeredRow.tofile(writeMatrix, sep='\t')
-            writeMatrix.write('\n')
-    with open(fileMatrixTranspose, 'w') as writeMatrixTranspose:
-        # Save the matrix with a column on each line.
-        for i in range(numCols):
-            centeredCol = matrix[:, i] - matrixMean[i]  # Center the column.
-            centeredCol.reshape(numRows, 1)  # Reshape it to a column array (so it can be transposed).
-            centeredCol = centeredCol.T
-            centeredCol.tofile(writeMatrixTranspose, sep='\t')
-            writeMatrixTranspose.write('\n')
\ No newline at end of file
+        for i in centered_blocks(matrix, matrixMean, rowsPerBlock):
+            write_rows(i, writeMatrix)
+
+
+def write_centered_columns(matrix, matrixMean, fileMatrixTranspose, rowsPerBlock, maxOpenFiles=256):
+    """Save the centered matrix with a column on each line.
+
+    An external memory transpose is used. Each block of rows is transposed and saved in a temporary file, so that
+    line i of each temporary file holds part of column i. The lines of the temporary files are then joined to give
+    the complete columns. If there are more temporary files than can be opened at once, then they are joined in groups,
+    with the results of each group being joined in turn.
+
+    :param matrix:                  The matrix to be centered and stored
+    :type matrix:                   numpy/scipy 2D array or matrix
+    :param matrixMean:              The mean of the matrix's columns
+    :type matrixMean:               numpy array
+    :param fileMatrixTranspose:     The location to save the transpose of the centered matrix
+    :type fileMatrixTranspose:      string
+    :param rowsPerBlock:            The number of rows to center at a time
+    :type rowsPerBlock:             int
+    :param maxOpenFiles:            The maximum number of temporary files to join at once
+    :type maxOpenFiles:             int
+    :return :                       The total sum of squares of the centered matrix.
+    :rtype :                        float
+
+    """
+
+    sumSquares = 0.0
+    if matrix.shape[0] <= rowsPerBlock:
+        # The whole matrix fits in a single block, so it can be transposed in memory.
+        with open(fileMatrixTranspose, 'w') as writeMatrixTranspose:
+            for i in centered_blocks(matrix, matrixMean, rowsPerBlock):
+                sumSquares += numpy.vdot(i, i)
+                write_rows(numpy.ascontiguousarray(i.T), writeMatrixTranspose)
+        return float(sumSquares)
+
+    # Save the transpose of each block to a temporary file.
+    tempDirectory = os.path.dirname(os.path.abspath(fileMatrixTranspose))
+    chunkFiles = []
+    try:
+        for i in centered_blocks(matrix, matrixMean, rowsPerBlock):
+            sumSquares += numpy.vdot(i, i)
+            fileDescriptor, chunkFile = tempfile.mkstemp(suffix=".tsv", dir=tempDirectory)
+            chunkFiles.append(chunkFile)
+            with os.fdopen(fileDescriptor, 'w') as writeChunk:
+                write_rows(numpy.ascontiguousarray(i.T), writeChunk)
+
+        # Join the lines of the temporary files, a group at a time if there are too many to open at once.
+        while len(chunkFiles) > maxOpenFiles:
+            joinedFiles = []
+            for i in range(0, len(chunkFiles), maxOpenFiles):
+                fileDescriptor, joinedFile = tempfile.mkstemp(suffix=".tsv", dir=tempDirectory)
+                os.close(fileDescriptor)
+                joinedFiles.append(joinedFile)
+                join_lines(chunkFiles[i:i + maxOpenFiles], joinedFile)
+            for i in chunkFiles:
+                os.remove(i)
+            chunkFiles = joinedFiles
+        join_lines(chunkFiles, fileMatrixTranspose)
+    finally:
+        for i in chunkFiles:
+            if os.path.exists(i):
+                os.remove(i)
+
+    return float(sumSquares)
+
+
+def join_lines(inputFiles, outputFile):
+    """Join corresponding lines of files, separating the parts with a tab.
+
+    :param inputFiles:      The locations of the files to join. Each must have the same number of lines.
+    :type inputFiles:       list of strings
+    :param outputFile:      The location to save the joined lines.
+    :type outputFile:       string
+
+    """
+
+    readers = [open(i, 'r') for i in inputFiles]
+    try:
+        with open(outputFile, 'w') as writeOutput:
+            for i in zip(*readers):
+                writeOutput.write('\t'.join(j.rstrip('\n') for j in i))
+                writeOutput.write('\n')
+    finally:
+        for i in readers:
+            i.close()
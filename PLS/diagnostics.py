@@ -0,0 +1,96 @@
+import numpy
+from scipy import sparse
+
+
+def total_sum_squares(matrix, matrixMean=None):
+    """Calculate the total sum of squares of a matrix about its column means.
+
+    The squared deviations from the means are summed directly, rather than using sum(X^2) - n * sum(mean^2), which
+    loses all precision when the means are large relative to the spread. A sparse matrix is never made dense: the
+    deviations of its nonzero values are summed, and each column's implicit zeros add (n - nnz_j) * mean_j^2.
+    Pass a matrixMean of 0 for a matrix that has already been centered.
+
+    :param matrix:          The n x p matrix.
+    :type matrix:           numpy/scipy 2D array or matrix (or a numpy 1D array)
+    :param matrixMean:      The mean of the matrix's columns. Calculated if not provided.
+    :type matrixMean:       numpy array/matrix or float
+    :return :               The total sum of squares.
+    :rtype :                float
+
+    """
+
+    if matrixMean is None:
+        matrixMean = matrix.mean(axis=0)
+    if sparse.issparse(matrix):
+        matrix = sparse.csc_matrix(matrix)
+        if not matrix.has_canonical_format:
+            matrix = matrix.copy()
+            matrix.sum_duplicates()
+        [numRows, numCols] = matrix.shape
+        matrixMean = numpy.broadcast_to(numpy.asarray(matrixMean, dtype=numpy.float64).ravel(), (numCols,))
+        nonzerosPerColumn = numpy.diff(matrix.indptr)
+        deviations = matrix.data - numpy.repeat(matrixMean, nonzerosPerColumn)
+        return float(numpy.vdot(deviations, deviations) + (numRows - nonzerosPerColumn).dot(numpy.square(matrixMean)))
+
+    matrix = numpy.asarray(matrix)
+    if numpy.any(matrixMean):
+        matrix = matrix - numpy.asarray(matrixMean).reshape(matrix.shape[1:])
+    return float(numpy.vdot(matrix, matrix))
+
+
+def variance_explained(loadings, totalSumSquares):
+    """Calculate the fraction of the variance of a matrix explained by each component.
+
+    As the X scores have unit length, the sum of squares explained by a component is the sum of its squared loadings.
+    The cumulative sum of the fractions gives R2X (from the X loadings) or R2Y (from the Y loadings).
+
+    :param loadings:        The loadings (one column per component).
+    :type loadings:         numpy matrix
+    :param totalSumSquares: The total sum of squares of the centered matrix (see total_sum_squares).
+    :type totalSumSquares:  float
+    :return :               The fraction of the variance explained by each component.
+    :rtype :                numpy array
+
+    """
+
+    # Sum the squares a column at a time, so that no p x k temporary is made from loadings stored on disk.
+    loadings = numpy.asarray(loadings)
+    return numpy.einsum('ij,ij->j', loadings, loadings) / totalSumSquares
+
+
+def vip(weights, yLoadings):
+    """Calculate the variable importance in projection (VIP) score of each predictor.
+
+    VIP_j = sqrt(p * sum_a(SSY_a * (w_ja / |w_a|)^2) / sum_a(SSY_a)), where SSY_a is the sum of squares of Y explained
+    by component a (the sum of its squared Y loadings, as the X scores have unit length).
+
+    :param weights:         The p x k matrix of weights.
+    :type weights:          numpy matrix
+    :param yLoadings:       The m x k matrix of Y loadings.
+    :type yLoadings:        numpy matrix
+    :return :               The VIP score of each predictor.
+    :rtype :                numpy array
+
+    """
+
+    # The weights are only read through einsum, so no p x k temporary is made from weights stored on disk.
+    weights = numpy.asarray(weights)
+    numPredictors = weights.shape[0]
+    sumSquaresY = numpy.square(numpy.asarray(yLoadings)).sum(axis=0)
+    componentScale = sumSquaresY / numpy.einsum('ij,ij->j', weights, weights)
+    return numpy.sqrt(numPredictors * numpy.einsum('ij,ij,j->i', weights, weights, componentScale) / sumSquaresY.sum())
+
+
+def q_squared(press, totalSumSquaresY):
+    """Calculate the cross validated Q2 from the prediction error sum of squares.
+
+    :param press:               The sum of squared errors of the held out predictions (PRESS).
+    :type press:                float or numpy array (e.g. one entry per number of components)
+    :param totalSumSquaresY:    The total sum of squares of the centered Y matrix (see total_sum_squares).
+    :type totalSumSquaresY:     float
+    :return :                   Q2 = 1 - PRESS / SSY
+    :rtype :                    float or numpy array
+
+    """
+
+    return 1 - numpy.asarray(press) / totalSumSquaresY
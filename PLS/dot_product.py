@@ -1,13 +1,14 @@
 import numpy
 
 
-def dot_product(fileX, numRowsX, Y, sep='\t'):
+def dot_product(fileX, numRowsX, Y, sep='\t', out=None, rowsPerBlock=1024):
     """Calculate the dot product of X and Y.
 
     X is stored in the file fileX. If (X.T).dot(Y) needs to be calculated, then record the transpose of X in a file
     and pass that location in as the first parameter.
 
-    There is no checking whether the dot product of the matrices is too large for memory. It is assumed that it will fit.
+    There is no checking whether the dot product of the matrices is too large for memory. It is assumed that it will fit,
+    unless out is given (e.g. a memory-mapped array), in which case the result is written to it a block of rows at a time.
 
     :param fileX:           Location where the X matrix is stored.
     :type fileX:            string
@@ -17,7 +18,11 @@ def dot_product(fileX, numRowsX, Y, sep='\t'):
     :type Y:                numpy/scipy array/matrix
     :param sep:             The separator used between elements of the X matrix.
     :type sep:              string
-    :return :               The dot product of the two matrices.
+    :param out:             Where to store the dot product. A new matrix is created if not provided.
+    :type out:              numpy array/matrix or None
+    :param rowsPerBlock:    The number of rows of the dot product to calculate before storing them in out.
+    :type rowsPerBlock:     int
+    :return :               The dot product of the two matrices (out if provided).
     :rtype :                numpy matrix
 
     """
@@ -36,15 +41,22 @@ def dot_product(fileX, numRowsX, Y, sep='\t'):
     # Preallocate the result matrix.
     # The matrix resulting from a dot product between X and Y has the same number of rows as X and the
     # same number of columns as Y.
-    dotProduct = numpy.matrix(numpy.empty((numRowsX, numResponses)))
+    if out is None:
+        out = numpy.matrix(numpy.empty((numRowsX, numResponses)))
 
-    # Calculate the dot product.
+    # Calculate the dot product, storing it a block of rows at a time.
+    block = numpy.empty((min(rowsPerBlock, max(numRowsX, 1)), numResponses))
     lineCount = 0
     with open(fileX, 'r') as readX:
         for line in readX:
             row = line.strip()
             row = numpy.fromstring(row, sep=sep)  # Generate a numpy array from the row.
-            dotProduct[lineCount, :] = row.dot(Y)  # Calculate the dor product of the row with the Y matrix.
+            block[lineCount % block.shape[0], :] = row.dot(Y)  # Calculate the dot product of the row with the Y matrix.
             lineCount += 1
+            if lineCount % block.shape[0] == 0:
+                out[lineCount - block.shape[0]:lineCount, :] = block
+    remainder = lineCount % block.shape[0]
+    if remainder:
+        out[lineCount - remainder:lineCount, :] = block[0:remainder]
 
-    return dotProduct
\ No newline at end of file
+    return out
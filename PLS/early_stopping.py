@@ -0,0 +1,98 @@
+import numpy
+import PLS.diagnostics
+
+
+class EarlyStopping(object):
+    """Decide when SIMPLS should stop extracting components.
+
+    The criteria available are:
+        None            -> never stop early
+        "singularValue" -> stop once the largest singular value of the deflated Cov falls below tolerance times that
+                           of the first component (checked before X is scanned for the component)
+        "yVariance"     -> stop once a component explains less than tolerance of the total variance of Y
+        "validation"    -> stop once a component fails to reduce the mean squared error of the predictions for a
+                           validation set by at least tolerance (relative to the error before it was added)
+    The component that triggers the stop is not kept, except that the first component is always kept, so that a fitted
+    model (and its VIP scores) never has zero components.
+
+    """
+
+    def __init__(self, criterion=None, tolerance=0.0, Y=None, validationData=None):
+        """Setup the criterion.
+
+        :param criterion:       The criterion used to stop (see above).
+        :type criterion:        string or None
+        :param tolerance:       The tolerance of the criterion.
+        :type tolerance:        float
+        :param Y:               The n x m matrix of centered responses (needed for "yVariance").
+        :type Y:                numpy array/matrix
+        :param validationData:  The validation predictors and responses, centered using the means of the training data
+                                (needed for "validation").
+        :type validationData:   tuple of (numpy/scipy matrix, numpy array)
+
+        """
+
+        if criterion not in (None, "singularValue", "yVariance", "validation"):
+            raise ValueError("Unknown stopping criterion '{0:s}'.".format(criterion))
+        if (criterion == "validation") and (validationData is None):
+            raise ValueError("Validation data is needed to stop using the validation error.")
+
+        self.criterion = criterion
+        self.tolerance = tolerance
+        self.firstSingularValue = None
+        self.numComponentsKept = 0
+        if criterion == "yVariance":
+            self.sumSquaresY = PLS.diagnostics.total_sum_squares(Y, 0)
+        if criterion == "validation":
+            [self.validationX, validationY] = validationData
+            validationY = numpy.asarray(validationY)
+            self.validationY = validationY.reshape(validationY.shape[0], -1)
+            self.validationPrediction = numpy.zeros(self.validationY.shape)  # The prediction with no components.
+            self.validationError = numpy.square(self.validationY).mean()
+
+    def stop_at_singular_value(self, s):
+        """Determine whether to stop before scanning X for a component.
+
+        :param s:               The largest singular value of the deflated Cov.
+        :type s:                float
+        :return :               Whether to stop.
+        :rtype :                bool
+
+        """
+
+        if self.firstSingularValue is None:
+            self.firstSingularValue = s
+            return False
+        return (self.criterion == "singularValue") and (s < self.tolerance * self.firstSingularValue)
+
+    def stop_at_component(self, w, q):
+        """Determine whether to stop once the weights and Y loadings of a component are known.
+
+        If the component is kept, then the validation predictions are updated to include it.
+
+        :param w:               The p x 1 weights of the component.
+        :type w:                numpy matrix
+        :param q:               The m x 1 Y loadings of the component.
+        :type q:                numpy matrix
+        :return :               Whether to stop.
+        :rtype :                bool
+
+        """
+
+        isStopped = False
+        if self.criterion == "yVariance":
+            isStopped = numpy.square(q).sum() < self.tolerance * self.sumSquaresY
+        elif self.criterion == "validation":
+            # The predictions for the validation set gain X_val*wi*qi' from each component.
+            prediction = self.validationPrediction + numpy.asarray(self.validationX.dot(w)).dot(numpy.asarray(q).T)
+            error = numpy.square(self.validationY - prediction).mean()
+            isStopped = error > (1 - self.tolerance) * self.validationError
+        if isStopped and (self.numComponentsKept > 0):
+            return True
+
+        # The component is kept (as the first component always is).
+        if self.criterion == "validation":
+            self.validationPrediction = prediction
+            self.validationError = error
+        self.numComponentsKept += 1
+        return False
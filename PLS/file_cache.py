@@ -0,0 +1,179 @@
+import hashlib
+import numpy
+import os
+import tempfile
+
+
+class FileStatisticsCache(object):
+    """An on-disk cache of statistics derived from a saved (centered) X matrix.
+
+    Each entry is keyed by a fingerprint of the X file (its size, modification time and a hash of its content), so
+    changing the file invalidates the entry. The statistics stored for a file are:
+        numObservations -> the number of rows of X
+        numPredictors   -> the number of columns of X
+        rowOffsets      -> the byte offset of the start of each row in the file (allowing random access to rows)
+        gram            -> X'*X, only stored when X has at most maxGramPredictors columns
+        columnNorms     -> the Euclidean norm of each column of X (the square root of the diagonal of X'*X), only
+                           stored along with gram
+    All of these are calculated in a single scan of the file. When X'*X is not stored, the values of X are never
+    parsed, so the scan only finds the start of each line.
+
+    No sketch of X'*X is stored for wider matrices, as SIMPLS needs X'*X exactly for the scores to remain orthonormal.
+
+    Entries are saved as .npz files in the cache directory. Once the total size of the entries exceeds maxSize, the
+    least recently used entries are removed.
+
+    """
+
+    def __init__(self, cacheDirectory, maxSize=2**30, maxGramPredictors=2000, sep='\t'):
+        """Open (creating if needed) a cache.
+
+        :param cacheDirectory:      The directory in which to save the cache entries.
+        :type cacheDirectory:       string
+        :param maxSize:             The maximum number of bytes that the cache entries may take up.
+        :type maxSize:              int
+        :param maxGramPredictors:   The largest number of predictors for which the Gram matrix will be stored.
+        :type maxGramPredictors:    int
+        :param sep:                 The separator used between elements of the X matrix.
+        :type sep:                  string
+
+        """
+
+        self.cacheDirectory = cacheDirectory
+        self.maxSize = maxSize
+        self.maxGramPredictors = maxGramPredictors
+        self.sep = sep
+        if not os.path.isdir(cacheDirectory):
+            os.makedirs(cacheDirectory)
+
+    def fingerprint(self, fileLocation, sampleSize=2**20):
+        """Determine the fingerprint of a file.
+
+        The content hash covers the first, middle and last sampleSize bytes of the file (and therefore the entire
+        file when it is small), so that fingerprinting a large file does not require a full scan of it.
+
+        :param fileLocation:    The location of the file.
+        :type fileLocation:     string
+        :param sampleSize:      The number of bytes hashed at each sampled position.
+        :type sampleSize:       int
+        :return :               The fingerprint.
+        :rtype :                string
+
+        """
+
+        fileStats = os.stat(fileLocation)
+        contentHash = hashlib.sha1()
+        contentHash.update("{0:d}:{1:d}".format(fileStats.st_size, fileStats.st_mtime_ns).encode())
+        with open(fileLocation, 'rb') as readFile:
+            for i in sorted(set([0, max(0, fileStats.st_size // 2 - sampleSize // 2), max(0, fileStats.st_size - sampleSize)])):
+                readFile.seek(i)
+                contentHash.update(readFile.read(sampleSize))
+        return contentHash.hexdigest()
+
+    def statistics(self, fileX):
+        """Get the statistics of a saved X matrix, calculating and caching them if they are not already cached.
+
+        :param fileX:           Location where the X matrix is stored (with one row on each line).
+        :type fileX:            string
+        :return :               The statistics (see the class description). gram is None if it is not stored.
+        :rtype :                dict
+
+        """
+
+        entryLocation = os.path.join(self.cacheDirectory, "{0:s}.npz".format(self.fingerprint(fileX)))
+        try:
+            with numpy.load(entryLocation) as entry:
+                statistics = dict((i, entry[i]) for i in entry.files)
+            os.utime(entryLocation, None)  # Record the use of the entry, so that it is evicted last.
+        except FileNotFoundError:
+            statistics = None  # Not cached (or evicted by another process while being read).
+        if statistics is not None:
+            statistics["numObservations"] = int(statistics["numObservations"])
+            statistics["numPredictors"] = int(statistics["numPredictors"])
+            statistics["columnNorms"] = statistics.get("columnNorms")
+            statistics["gram"] = statistics.get("gram")
+            return statistics
+
+        statistics = self.calculate_statistics(fileX)
+        # Write the entry to a temporary file and then move it into place, so that a concurrent reader (or a crash
+        # part way through writing) never leaves a partially written entry in the cache.
+        fileDescriptor, tempLocation = tempfile.mkstemp(suffix=".tmp", dir=self.cacheDirectory)
+        try:
+            with os.fdopen(fileDescriptor, 'wb') as writeEntry:
+                numpy.savez(writeEntry, **dict((i, j) for i, j in statistics.items() if j is not None))
+            os.replace(tempLocation, entryLocation)
+        except BaseException:
+            os.remove(tempLocation)
+            raise
+        self.evict()
+        return statistics
+
+    def calculate_statistics(self, fileX, rowsPerBlock=1024):
+        """Calculate the statistics of a saved X matrix in a single scan of the file.
+
+        :param fileX:           Location where the X matrix is stored (with one row on each line).
+        :type fileX:            string
+        :param rowsPerBlock:    The number of rows to accumulate X'*X over at a time (when it is stored).
+        :type rowsPerBlock:     int
+        :return :               The statistics (see the class description). gram is None if it is not stored.
+        :rtype :                dict
+
+        """
+
+        rowOffsets = []
+        numPredictors = 0
+        gram = None
+        block = []
+        offset = 0
+        with open(fileX, 'rb') as readX:
+            for line in readX:
+                if not rowOffsets:
+                    # The first row gives the number of predictors, and so whether X'*X will be stored.
+                    numPredictors = numpy.fromstring(line.decode().strip(), sep=self.sep).shape[0]
+                    if numPredictors <= self.maxGramPredictors:
+                        gram = numpy.zeros((numPredictors, numPredictors))
+                rowOffsets.append(offset)
+                offset += len(line)
+                if gram is not None:
+                    block.append(numpy.fromstring(line.decode().strip(), sep=self.sep))
+                    if len(block) == rowsPerBlock:
+                        block = numpy.array(block)
+                        gram += (block.T).dot(block)
+                        block = []
+        if block:
+            block = numpy.array(block)
+            gram += (block.T).dot(block)
+
+        return {"numObservations": len(rowOffsets),
+                "numPredictors": numPredictors,
+                "rowOffsets": numpy.array(rowOffsets, dtype=numpy.int64),
+                "columnNorms": None if gram is None else numpy.sqrt(numpy.diag(gram)),
+                "gram": gram}
+
+    def evict(self):
+        """Remove the least recently used entries until the entries take up at most maxSize bytes.
+
+        Entries may be evicted by other processes sharing the cache at the same time, so entries that have already
+        gone are skipped.
+
+        """
+
+        entries = []
+        for i in os.listdir(self.cacheDirectory):
+            if i.endswith(".npz"):
+                entryLocation = os.path.join(self.cacheDirectory, i)
+                try:
+                    entryStats = os.stat(entryLocation)
+                except FileNotFoundError:
+                    continue
+                entries.append((entryStats.st_mtime, entryStats.st_size, entryLocation))
+        entries.sort()
+        totalSize = sum(i[1] for i in entries)
+        for entryTime, entrySize, entryLocation in entries:
+            if totalSize <= self.maxSize:
+                break
+            totalSize -= entrySize
+            try:
+                os.remove(entryLocation)
+            except FileNotFoundError:
+                pass
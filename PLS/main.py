@@ -1,10 +1,14 @@
 import numpy
 import PLS.center_and_store
+import PLS.diagnostics
 import PLS.partition_dataset
 import PLS.simpls
+import PLS.sparsify
+from scipy import sparse
 import sys
 
-def pls(X, Y, numberComponents=10, cvFolds=0, cvMethod="MSE", isCVStratified=True, isMemUsed=True):
+def pls(X, Y, numberComponents=10, cvFolds=0, cvMethod="MSE", isCVStratified=True, isMemUsed=True, sparsity=None,
+        sparsityMethod="soft", outputLocation=None, stoppingCriterion=None, stoppingTolerance=0.0, validationData=None):
     """Perform PLS using the SIMPLS algorithm.
 
     Stuff about if X is sparse then it will try to make the matrix dense unless isMemUsed is false.
@@ -23,6 +27,22 @@ def pls(X, Y, numberComponents=10, cvFolds=0, cvMethod="MSE", isCVStratified=Tru
     :type isCVStratified:
     :param isMemUsed:
     :type isMemUsed:
+    :param sparsity:            The sparsity applied to the weights of each component (see PLS.sparsify.sparsify_weight).
+                                When used, the coefficients are returned as a scipy.sparse CSR matrix.
+    :type sparsity:             float, int, list or None
+    :param sparsityMethod:      The method used to make the weights sparse ("soft" or "topk").
+    :type sparsityMethod:       string
+    :param outputLocation:      Where to store the X loadings, X scores, Y scores and weights (see
+                                PLS.output_arrays.output_array).
+    :type outputLocation:       None, bool or string
+    :param stoppingCriterion:   The criterion used to stop extracting components before numberComponents have been
+                                extracted (see PLS.early_stopping.EarlyStopping). None always extracts them all.
+    :type stoppingCriterion:    string or None
+    :param stoppingTolerance:   The tolerance of the stopping criterion.
+    :type stoppingTolerance:    float
+    :param validationData:      The validation predictors and responses used by the "validation" stopping criterion
+                                (not centered).
+    :type validationData:       tuple of (numpy/scipy matrix, numpy array) or None
     :returns :
     :type :
 
@@ -66,6 +86,26 @@ def pls(X, Y, numberComponents=10, cvFolds=0, cvMethod="MSE", isCVStratified=Tru
     if isCVUsed and (cvFolds < 2):
         # There must be at least 2 CV folds.
         errorsFound.append("If a non-zero value is provided for the number of CV folds, then the number must be at least two.")
+    if sparsityMethod not in ("soft", "topk"):
+        # The sparsity method must be one that is implemented.
+        errorsFound.append("The sparsity method must be one of \"soft\" or \"topk\".")
+    if isinstance(sparsity, (list, tuple)) and len(sparsity) != numberComponents:
+        # A sparsity must be given for each component.
+        errorsFound.append("A sparsity must be provided for each of the {0:d} components.".format(numberComponents))
+    if sparsityMethod in ("soft", "topk"):
+        sparsities = sparsity if isinstance(sparsity, (list, tuple)) else [sparsity]
+        if not all(PLS.sparsify.is_valid_sparsity(i, sparsityMethod) for i in sparsities):
+            # The sparsity must not remove every weight (nor be meaningless for the method).
+            if sparsityMethod == "soft":
+                errorsFound.append("Each sparsity must be a number in [0, 1) when using the \"soft\" method.")
+            else:
+                errorsFound.append("Each sparsity must be an integer of at least one when using the \"topk\" method.")
+    if stoppingCriterion not in (None, "singularValue", "yVariance", "validation"):
+        # The stopping criterion must be one that is implemented.
+        errorsFound.append("The stopping criterion must be one of \"singularValue\", \"yVariance\" or \"validation\".")
+    if (stoppingCriterion == "validation") and (validationData is None):
+        # The validation criterion needs a validation set.
+        errorsFound.append("Validation data must be provided to stop using the validation error.")
     # TODO add checking that the cvMethod is one of "MSE", "EqualError" or a user supplied function meeting some to be decided criteria
 
     # Exit if errors were found.
@@ -78,17 +118,25 @@ def pls(X, Y, numberComponents=10, cvFolds=0, cvMethod="MSE", isCVStratified=Tru
     # Run appropriate PLS method. #
     ###############################
     # Center the data.
+    # The total sums of squares are collected while centering, so that X never needs to be revisited (or made dense)
+    # in order to determine the variance explained.
     meanX = X.mean(axis=0)
     meanY = Y.mean(axis=0)
+    Y = Y - meanY
+    sumSquaresY = PLS.diagnostics.total_sum_squares(Y, 0)
     if isMemUsed:
         # Center the data in memory.
+        # The sum of squares is taken before centering, so that a sparse X only needs its nonzero values visited.
+        sumSquaresX = PLS.diagnostics.total_sum_squares(X, meanX)
         X = X - meanX
-        Y = Y - meanY
     else:
         # Center the matrix and store it in a file.
         xLocation = "CenteredX.tsv"  # The location where the centered X matrix will be saved.
         xTransLocation = "CenteredXTranspose.tsv"  # The location where the transpose of the centered X matrix will be saved.
-        PLS.center_and_store.center_and_store(X, xLocation, xTransLocation)
+        sumSquaresX = PLS.center_and_store.center_and_store(X, xLocation, xTransLocation)
+    if validationData is not None:
+        # Center the validation data using the means of the training data.
+        validationData = (validationData[0] - meanX, validationData[1] - meanY)
 
     # Run PLS.
     returnObject = {}  # Object used to return the results.
@@ -105,21 +153,29 @@ def pls(X, Y, numberComponents=10, cvFolds=0, cvMethod="MSE", isCVStratified=Tru
         # Run PLS without cross validation.
         if isMemUsed:
             # Run SIMPLS without resorting to the file system.
-            xLoadings, yLoadings, xScores, yScores, weights = PLS.simpls.simpls_mem(X, Y, numberComponents)
+            xLoadings, yLoadings, xScores, yScores, weights = PLS.simpls.simpls_mem(X, Y, numberComponents, sparsity, sparsityMethod, outputLocation,
+                                                                                    stoppingCriterion, stoppingTolerance, validationData)
         else:
             # Run SIMPLS using the file system.
-            xLoadings, yLoadings, xScores, yScores, weights = PLS.simpls.simpls_mem(X, Y, numberComponents)
+            xLoadings, yLoadings, xScores, yScores, weights = PLS.simpls.simpls_file(xLocation, xTransLocation, Y, numberComponents, sparsity, sparsityMethod, outputLocation,
+                                                                                     stoppingCriterion=stoppingCriterion, stoppingTolerance=stoppingTolerance,
+                                                                                     validationData=validationData)
 
         # Calculate coefficients.
         coefficients = weights.dot(yLoadings.T)
         intercept = meanY - (meanX.dot(coefficients))
         coefficients = numpy.vstack((intercept, coefficients))
+        if sparsity is not None:
+            # Only the predictors selected by the sparse weights have nonzero coefficients.
+            coefficients = sparse.csr_matrix(coefficients)
 
-        # Calculate the percentage of the variance of X and Y that is explained.
-        xPercentVarExp = sum(numpy.square(abs(xLoadings))) / sum(sum(numpy.square(abs(X))))
-        yPercentVarExp = sum(numpy.square(abs(yLoadings))) / sum(sum(numpy.square(abs(Y))))
+        # Calculate the percentage of the variance of X and Y that is explained by each component.
+        # The cumulative sums of these give R2X and R2Y.
+        xPercentVarExp = PLS.diagnostics.variance_explained(xLoadings, sumSquaresX)
+        yPercentVarExp = PLS.diagnostics.variance_explained(yLoadings, sumSquaresY)
 
         # Setup the object used to return the results.
+        returnObject["numberComponents"] = xLoadings.shape[1]  # Fewer than requested if the fit stopped early.
         returnObject["xLoadings"] = xLoadings
         returnObject["yLoadings"] = yLoadings
         returnObject["xScores"] = xScores
@@ -128,6 +184,7 @@ def pls(X, Y, numberComponents=10, cvFolds=0, cvMethod="MSE", isCVStratified=Tru
         returnObject["coefficients"] = coefficients
         returnObject["xPercentVarExp"] = xPercentVarExp
         returnObject["yPercentVarExp"] = yPercentVarExp
+        returnObject["vip"] = PLS.diagnostics.vip(weights, yLoadings)
 
     return returnObject
 
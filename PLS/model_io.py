@@ -0,0 +1,78 @@
+import numpy
+import sys
+
+
+def save_model(fileLocation, coefficients):
+    """Save a fitted model so that it can be used for scoring.
+
+    :param fileLocation:    The location to save the model (an .npz file).
+    :type fileLocation:     string
+    :param coefficients:    The (p + 1) x m coefficients returned by PLS.main.pls, with the intercept in the first row.
+    :type coefficients:     numpy array/matrix or scipy.sparse matrix
+
+    """
+
+    if is_sparse(coefficients):
+        coefficients = coefficients.tocsr()
+        numpy.savez(fileLocation, data=coefficients.data, indices=coefficients.indices, indptr=coefficients.indptr,
+                    shape=coefficients.shape)
+    else:
+        numpy.savez(fileLocation, coefficients=numpy.asarray(coefficients))
+
+
+def load_model(fileLocation):
+    """Load a model saved by save_model.
+
+    :param fileLocation:    The location where the model has been saved.
+    :type fileLocation:     string
+    :return :               The coefficients, with the intercept in the first row.
+    :rtype :                numpy array or scipy.sparse CSR matrix
+
+    """
+
+    with numpy.load(fileLocation) as model:
+        if "coefficients" in model.files:
+            return model["coefficients"]
+        from scipy import sparse  # Only sparse models need scipy, so only import it for them.
+        return sparse.csr_matrix((model["data"], model["indices"], model["indptr"]), shape=tuple(model["shape"]))
+
+
+def predict(coefficients, X):
+    """Predict the responses for new observations.
+
+    :param coefficients:    The (p + 1) x m coefficients, with the intercept in the first row.
+    :type coefficients:     numpy array or scipy.sparse CSR matrix
+    :param X:               The n x p matrix of predictors (not centered).
+    :type X:                numpy array or scipy.sparse matrix
+    :return :               The n x m predicted responses.
+    :rtype :                numpy array
+
+    """
+
+    if is_sparse(X):
+        prediction = X.dot(coefficients[1:])
+    else:
+        # Calculated as (B'*X')' so that sparse coefficients perform the product, only touching the selected predictors.
+        prediction = (coefficients[1:].T).dot(numpy.asarray(X).T).T
+    if is_sparse(prediction):
+        prediction = prediction.toarray()
+    intercept = coefficients[0]
+    if is_sparse(intercept):
+        intercept = intercept.toarray()
+    return numpy.asarray(prediction) + numpy.asarray(intercept).ravel()
+
+
+def is_sparse(matrix):
+    """Determine whether a matrix is a scipy.sparse matrix without importing scipy.
+
+    If scipy.sparse has not been imported, then no sparse matrix can exist.
+
+    :param matrix:          The matrix to check.
+    :type matrix:           any
+    :return :               Whether the matrix is sparse.
+    :rtype :                bool
+
+    """
+
+    sparseModule = sys.modules.get("scipy.sparse")
+    return (sparseModule is not None) and sparseModule.issparse(matrix)
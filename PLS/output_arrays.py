@@ -0,0 +1,39 @@
+import numpy
+import os
+import tempfile
+
+
+def output_array(numRows, numCols, outputLocation=None, name=None):
+    """Allocate a zeroed matrix for an output of SIMPLS, either in memory or in a memory-mapped file.
+
+    Memory-mapped outputs are stored column-major, as SIMPLS fills its outputs one column (component) at a time.
+
+    :param numRows:         The number of rows in the output.
+    :type numRows:          int
+    :param numCols:         The number of columns in the output.
+    :type numCols:          int
+    :param outputLocation:  Where to store the output. None keeps it in memory, True places it in an anonymous
+                            temporary file (removed once the output is no longer used), and a string gives the
+                            directory in which to save it as name.dat.
+    :type outputLocation:   None, bool or string
+    :param name:            The name of the output (used to name its file when a directory is given).
+    :type name:             string
+    :return :               The zeroed output.
+    :rtype :                numpy matrix (possibly backed by a numpy.memmap)
+
+    """
+
+    if (outputLocation is None) or (outputLocation is False):
+        return numpy.matrix(numpy.zeros((numRows, numCols)))
+
+    if outputLocation is True:
+        # The temporary file is deleted as soon as it is closed, but the mapping of it remains valid until the
+        # output is garbage collected.
+        with tempfile.TemporaryFile() as backingFile:
+            output = numpy.memmap(backingFile, dtype=numpy.float64, mode='w+', shape=(numRows, numCols), order='F')
+    else:
+        fileLocation = os.path.join(outputLocation, "{0:s}.dat".format(name))
+        output = numpy.memmap(fileLocation, dtype=numpy.float64, mode='w+', shape=(numRows, numCols), order='F')
+
+    # A newly created memory-mapped file is already zeroed.
+    return numpy.asmatrix(output)
@@ -1,20 +1,33 @@
-import collections
 import numpy
-import random
-import sys
+import warnings
 
 
-def partition_dataset(Y, cvFolds, isStratified=False):
+def partition_dataset(Y, cvFolds, isStratified=False, seed=None, repeats=1, groups=None):
     """Partition a dataset into CV folds.
 
-    :param Y:
-    :type Y:
-    :param cvFolds:
-    :type cvFolds:
-    :param isStratified:
-    :type isStratified:
-    :return :
-    :rtype :
+    Stratified partitioning only makes sense in cases of classification
+        For PLS1, observations will be grouped by their response value (the number of groups will be the number of unique response values)
+        For PLS2, each response variable will be treated as a class. Observations will be grouped based on nonzero values in the response variable.
+            If an observation does not have a nonzero value for exactly one response variable an error will be raised.
+
+    If groups are given, then all observations in the same group are placed in the same fold, and the folds are
+    chosen so that they contain as close to the same number of observations as possible.
+
+    :param Y:               The n x m matrix of responses.
+    :type Y:                numpy.array
+    :param cvFolds:         The number of CV folds.
+    :type cvFolds:          int
+    :param isStratified:    Whether the folds should be stratified by class.
+    :type isStratified:     bool
+    :param seed:            The seed (or generator) used to randomise the partitioning.
+    :type seed:             int, numpy.random.Generator or None
+    :param repeats:         The number of independent partitions to generate (for repeated k-fold CV).
+    :type repeats:          int
+    :param groups:          The group that each observation belongs to.
+    :type groups:           numpy.array or None
+    :return :               The fold of each observation. If repeats is greater than one, then each row contains
+                            one partitioning.
+    :rtype :                numpy.array of ints (n or repeats x n)
 
     """
 
@@ -28,72 +41,82 @@ def partition_dataset(Y, cvFolds, isStratified=False):
         # There are multiple response variables (PLS2).
         [numObservations, numResponses] = yDimensions
 
-    if isStratified:
-        # Create stratified partitions.        
-        indicesOfClasses = []  # Class of each observation. indicesOfClasses[i] indicates the class of the ith observation.
+    if cvFolds < 2:
+        raise ValueError("The number of CV folds must be at least two.")
+    if repeats < 1:
+        raise ValueError("The number of repeats must be at least one.")
+    generator = numpy.random.default_rng(seed)
+
+    if groups is not None:
+        # Create partitions where no group is split between folds.
+        if isStratified:
+            raise ValueError("Stratified CV can not be performed when the observations are grouped.")
+        groups = numpy.asarray(groups).ravel()
+        if groups.shape[0] != numObservations:
+            raise ValueError("There are {0:d} groups provided for {1:d} observations.".format(groups.shape[0], numObservations))
+        differentGroups, groupMembership = numpy.unique(groups, return_inverse=True)
+        numGroups = differentGroups.shape[0]
+        if numGroups < cvFolds:
+            warnings.warn("There are {0:d} groups, so not all of the {1:d} folds will contain observations.".format(numGroups, cvFolds))
+
+        # Randomise the order of the groups, and then cut the ordering into cvFolds pieces of (close to) equal numbers
+        # of observations. Each group is placed in the fold containing the middle of its observations.
+        #     Group sizes in randomised order -> [3, 1, 4, 2]
+        #     Middle of each group -> [1.5, 3.5, 6, 9] (out of 10)
+        #     Fold of each group (if cvFolds == 2) -> floor([1.5, 3.5, 6, 9] * 2 / 10) = [0, 0, 1, 1]
+        groupSizes = numpy.bincount(groupMembership, minlength=numGroups)
+        partition = numpy.empty((repeats, numObservations), dtype=int)
+        for i in range(repeats):
+            groupOrder = generator.permutation(numGroups)
+            observationsBefore = numpy.cumsum(groupSizes[groupOrder]) - groupSizes[groupOrder]
+            groupFold = numpy.empty(numGroups, dtype=int)
+            groupFold[groupOrder] = ((2 * observationsBefore + groupSizes[groupOrder]) * cvFolds) // (2 * numObservations)
+            partition[i, :] = groupFold[groupMembership]
+    elif isStratified:
+        # Create stratified partitions.
         if numResponses == 1:
             # Y is a column vector, so determine classes from the unique values of Y.
-            differentValues = numpy.unique(Y)
+            differentValues, classMembership = numpy.unique(numpy.asarray(Y).ravel(), return_inverse=True)
             if differentValues.shape[0] == 1:
-                print("Stratified CV was requested, but only one class was found.")
-                sys.exit()
-
-            # Determine the number of the class each observation belongs to.
-            classMembership = Y.tolist()  # Create the list to hold the class number for each observation.
-            classMapping = dict([(i, ind) for ind, i in enumerate(differentValues)])  # Mapping from values in Y to class number.
-            classMembership = [classMapping[i] for i in classMembership]
+                raise ValueError("Stratified CV was requested, but only one class was found.")
         else:
             # PLS2 is being performed. Each response variable is taken to be a class.
-            nonzeroResponse = numpy.nonzero(Y)
-            rowsWithValues = nonzeroResponse[0]
-            if len(set(rowsWithValues)) != len(rowsWithValues):
-                # There is at least one row with a value for multiple response variables. Stratified CV can therefore not be performed.
-                print("Stratified CV was requested, but there are observations with values for multiple response variables. There class can not be determined.")
-                sys.exit()
-
-            # Determine the number of the class each observation belongs to.
-            classMembership = nonzeroResponse[1].tolist()
+            rowsWithValues, classMembership = numpy.nonzero(Y)
+            if numpy.any(numpy.bincount(rowsWithValues, minlength=numObservations) != 1):
+                # There is at least one row with a value for no or multiple response variables. Stratified CV can therefore not be performed.
+                raise ValueError("Stratified CV was requested, but there are observations without a value for exactly one response variable. Their class can not be determined.")
 
         # Generate a warning if any class has too few observations to be in all folds.
-        for i in set(classMembership):
-            occurences = classMembership.count(i)
-            if occurences < cvFolds:
-                print("WARNING: class {0:d} occurs {1:d} times, and will not appear in each of the {2:d} folds.".format(i, occurences, cvFolds))
+        classSizes = numpy.bincount(classMembership)
+        for i in numpy.flatnonzero((classSizes > 0) & (classSizes < cvFolds)):
+            warnings.warn("Class {0:d} occurs {1:d} times, and will not appear in each of the {2:d} folds.".format(i, classSizes[i], cvFolds))
 
         # Determine the partitions.
-        # Start with a list of class memberships -> [0, 1, 2, 0, 0, 1, 0, 2, 1, 0, 2, 0, 0, 1, 2, 1, 0, 0]
-        # Create dictionary mapping class to indices -> {0 : [0, 3, 4, 6, 9, 11, 12, 16, 17], 1 : [1, 5, 8, 13, 15], 2 : [2, 7, 10, 14]}
-        # Randomise each classes indices -> {0 : [4, 6, 9, 3, 17, 16, 0, 12, 11], 1 : [13, 1, 5, 15, 8], 2 : [10, 14, 7, 2]}
-        # Split each class into cvFolds partitions -> {0 : [[0, 6, 12], [3, 9, 16], [4, 11, 17]], 1 : [[1, 13], [5, 15], [8]], 2 : [[2, 14], [7], [10]]}
-        #     The overall partitions can be determined from this. For example, the first partition will be [0, 6, 12, 1, 13, 2, 4].
-        # Assign partition groupings according to original indices -> [0, 0, 0, 1, 2, 1, 0, 1, 2, 1, 2, 2, 0, 0, 0, 1, 1, 2]
+        # Start with a list of class memberships -> [0, 1, 2, 0, 0, 1, 0, 2, 1]
+        # Randomise the order of the observations -> [4, 1, 8, 2, 0, 6, 7, 5, 3]
+        # Stably sort the randomised observations by class -> [4, 0, 6, 3, 1, 8, 5, 2, 7]
+        # Deal the sorted observations into cvFolds partitions -> [0, 1, 2, 0, 1, 2, 0, 1, 2] (if cvFolds == 3)
+        # Assign partition groupings according to original indices -> [1, 1, 1, 0, 0, 0, 2, 2, 2]
         #
-        # Folds are only guaranteed to have a bound on the difference in the number of observations they contain.
-        # The largest possible difference in size between the fold with the most observations and the one with the least is equal to the number of classes.
-        #     Classes -> {0 : [[1, 2], [3]], 1 : [[4, 5], [6]], 2 : [[7, 8], [9]]}
-        #     Partition -> [0, 0, 1, 0, 0, 1, 0, 0, 1]
-        classIndices = collections.defaultdict(list)  # Indices of the observations belonging to each class.
-        for ind, i in enumerate(classMembership):
-            classIndices[i].append(ind)
-        partition = [0] * numObservations  # Create the list to hold the partition number for each observation.
-        for i in classIndices:
-            random.shuffle(classIndices[i])  # Randomise the list of observations belonging to each class.
-            classIndices[i] = [classIndices[i][j::cvFolds] for j in range(cvFolds)]  # Partition each class into cvFolds different groups.
-            for ind, j in enumerate(classIndices[i]):
-                for k in j:
-                    partition[k] = ind
+        # As the observations of each class are consecutive in the sorted order, each class is spread evenly across the
+        # folds, and the number of observations in any two folds differs by at most one.
+        # Storing the classes in the smallest integer type possible allows a radix sort to be used.
+        classMembership = classMembership.astype(numpy.min_scalar_type(classSizes.shape[0]))
+        partition = numpy.empty((repeats, numObservations), dtype=int)
+        for i in range(repeats):
+            observationOrder = generator.permutation(numObservations)
+            observationOrder = observationOrder[numpy.argsort(classMembership[observationOrder], kind="stable")]
+            partition[i, observationOrder] = numpy.arange(numObservations) % cvFolds
     else:
         # Create random partitions where each partition has an equal number of observations.
         # Start with a list of the indices of the observations ->  [0, 1, 2, 3, 4, 5, 6, 7, 8, 9]
         # Randomise the list -> [7, 4, 8, 1, 5, 6, 9, 2, 3, 0]
-        # Partition the indices -> [[7, 1, 9, 0], [4, 5, 2], [8, 6, 3]] (if cvFolds == 3)
+        # Deal the randomised indices into partitions -> [0, 1, 2, 0, 1, 2, 0, 1, 2, 0] (if cvFolds == 3)
         # Assign partition groupings according to original indices -> [0, 0, 1, 2, 1, 1, 2, 0, 2, 0]
-        observationIndices = list(range(numObservations))  # List containing the index of each observation.
-        random.shuffle(observationIndices)  # Randomise the order of the indices.
-        partitionedIndices = [observationIndices[i::cvFolds] for i in range(cvFolds)]  # Populate each partition with every nth observation.
-        partition = [0] * numObservations  # Create the list to hold the partition number for each observation.
-        for ind, i in enumerate(partitionedIndices):
-            for j in i:
-                partition[j] = ind
+        partition = numpy.empty((repeats, numObservations), dtype=int)
+        for i in range(repeats):
+            partition[i, generator.permutation(numObservations)] = numpy.arange(numObservations) % cvFolds
 
-    return partition
\ No newline at end of file
+    if repeats == 1:
+        return partition[0]
+    return partition
@@ -0,0 +1,347 @@
+import argparse
+import collections
+import concurrent.futures
+import http.server
+import json
+import numbers
+import numpy
+import os
+import PLS.model_io
+import queue
+from scipy import sparse
+import threading
+import time
+import urllib.request
+
+
+class UnknownModelError(Exception):
+    """Raised when a requested model does not exist in the model directory."""
+
+
+class ModelCache(object):
+    """A least recently used cache of loaded models."""
+
+    def __init__(self, modelDirectory, capacity=8):
+        """Create an empty cache.
+
+        :param modelDirectory:  The directory containing the models (saved by PLS.model_io.save_model as <name>.npz).
+        :type modelDirectory:   string
+        :param capacity:        The maximum number of models to keep loaded.
+        :type capacity:         int
+
+        """
+
+        self.modelDirectory = modelDirectory
+        self.capacity = capacity
+        self.models = collections.OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, modelName):
+        """Get the coefficients of a model, loading it if it is not already loaded.
+
+        :param modelName:       The name of the model.
+        :type modelName:        string
+        :return :               The coefficients of the model.
+        :rtype :                numpy array or scipy.sparse CSR matrix
+
+        """
+
+        with self.lock:
+            if modelName in self.models:
+                self.models.move_to_end(modelName)
+                return self.models[modelName]
+
+        if (os.path.basename(modelName) != modelName) or modelName.startswith('.'):
+            raise UnknownModelError("Invalid model name '{0:s}'.".format(modelName))
+        modelLocation = os.path.join(self.modelDirectory, "{0:s}.npz".format(modelName))
+        if not os.path.exists(modelLocation):
+            raise UnknownModelError("Unknown model '{0:s}'.".format(modelName))
+        coefficients = PLS.model_io.load_model(modelLocation)
+
+        with self.lock:
+            self.models[modelName] = coefficients
+            self.models.move_to_end(modelName)
+            while len(self.models) > self.capacity:
+                self.models.popitem(last=False)
+        return coefficients
+
+
+class MicroBatcher(object):
+    """Gather concurrent scoring requests into batches, scoring each batch with a single product per model.
+
+    Requests are collected until maxBatchSize rows are waiting or maxDelay seconds have passed since the first of
+    them arrived, whichever is sooner.
+
+    """
+
+    def __init__(self, modelCache, maxBatchSize=256, maxDelay=0.002):
+        """Start the thread scoring the batches.
+
+        :param modelCache:      The cache to get models from.
+        :type modelCache:       ModelCache
+        :param maxBatchSize:    The maximum number of rows in a batch.
+        :type maxBatchSize:     int
+        :param maxDelay:        The maximum number of seconds to wait for a batch to fill.
+        :type maxDelay:         float
+
+        """
+
+        self.modelCache = modelCache
+        self.maxBatchSize = maxBatchSize
+        self.maxDelay = maxDelay
+        self.requests = queue.Queue()
+        self.statsLock = threading.Lock()
+        self.startTime = time.time()
+        self.numRequests = 0
+        self.numRows = 0
+        self.numBatches = 0
+        self.totalLatency = 0.0
+        self.maxLatency = 0.0
+        self.worker = threading.Thread(target=self.run)
+        self.worker.daemon = True
+        self.worker.start()
+
+    def submit(self, modelName, row):
+        """Queue a single row for scoring.
+
+        :param modelName:       The name of the model to score the row with.
+        :type modelName:        string
+        :param row:             The row of predictors, either dense (a list of values) or sparse (a dict with
+                                "indices" and "values").
+        :type row:              list or dict
+        :return :               A future giving the predicted responses.
+        :rtype :                concurrent.futures.Future
+
+        """
+
+        # Check the request before queueing it, so that a bad request does not fail the rest of its batch.
+        rows_to_matrix([row], self.modelCache.get(modelName).shape[0] - 1)
+
+        future = concurrent.futures.Future()
+        self.requests.put((modelName, row, future, time.time()))
+        return future
+
+    def run(self):
+        """Score batches of requests as they arrive."""
+
+        while True:
+            batch = [self.requests.get()]
+            deadline = time.time() + self.maxDelay
+            while len(batch) < self.maxBatchSize:
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self.requests.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            self.score_batch(batch)
+
+    def score_batch(self, batch):
+        """Score a batch of requests, with one product for the rows of each model."""
+
+        rowsByModel = collections.defaultdict(list)
+        for i in batch:
+            rowsByModel[i[0]].append(i)
+
+        for modelName, requests in rowsByModel.items():
+            try:
+                coefficients = self.modelCache.get(modelName)
+                predictions = PLS.model_io.predict(coefficients, rows_to_matrix([i[1] for i in requests], coefficients.shape[0] - 1))
+            except Exception as error:
+                for i in requests:
+                    i[2].set_exception(error)
+                continue
+            for i, j in zip(requests, predictions):
+                i[2].set_result(j.tolist())
+
+        finishTime = time.time()
+        with self.statsLock:
+            self.numBatches += 1
+            self.numRows += len(batch)
+            for i in batch:
+                latency = finishTime - i[3]
+                self.totalLatency += latency
+                self.maxLatency = max(self.maxLatency, latency)
+
+    def stats(self):
+        """Get the latency and throughput counters.
+
+        :return :               The counters.
+        :rtype :                dict
+
+        """
+
+        with self.statsLock:
+            uptime = time.time() - self.startTime
+            return {"requests": self.numRequests,
+                    "rows": self.numRows,
+                    "batches": self.numBatches,
+                    "meanBatchSize": self.numRows / self.numBatches if self.numBatches else 0.0,
+                    "meanLatency": self.totalLatency / self.numRows if self.numRows else 0.0,
+                    "maxLatency": self.maxLatency,
+                    "rowsPerSecond": self.numRows / uptime if uptime > 0 else 0.0,
+                    "uptime": uptime}
+
+
+def rows_to_matrix(rows, numPredictors):
+    """Stack rows received in requests into a matrix.
+
+    :param rows:            The rows, each either dense (a list of values) or sparse (a dict with "indices" and
+                            "values").
+    :type rows:             list
+    :param numPredictors:   The number of predictors of the model.
+    :type numPredictors:    int
+    :return :               The stacked rows (sparse if any of the rows are).
+    :rtype :                numpy array or scipy.sparse CSR matrix
+
+    """
+
+    if not any(isinstance(i, dict) for i in rows):
+        matrix = numpy.array(rows, dtype=numpy.float64)
+        if matrix.shape != (len(rows), numPredictors):
+            raise ValueError("Each row must have {0:d} predictors.".format(numPredictors))
+        return matrix
+
+    data = []
+    indices = []
+    indptr = [0]
+    for i in rows:
+        if isinstance(i, dict):
+            if not (isinstance(i.get("indices"), list) and isinstance(i.get("values"), list)):
+                raise ValueError("Each sparse row must have lists of \"indices\" and \"values\".")
+            if len(i["values"]) != len(i["indices"]):
+                raise ValueError("Each sparse row must have as many values as indices.")
+            # Building the CSR matrix would truncate non-integer indices and sum repeated ones, so reject both.
+            if any(isinstance(j, bool) or not isinstance(j, numbers.Integral) for j in i["indices"]):
+                raise ValueError("The indices of each sparse row must be integers.")
+            if any((j < 0) or (j >= numPredictors) for j in i["indices"]):
+                raise ValueError("The indices of each sparse row must be between 0 and {0:d}.".format(numPredictors - 1))
+            if len(set(i["indices"])) != len(i["indices"]):
+                raise ValueError("The indices of each sparse row must not be repeated.")
+            data.extend(i["values"])
+            indices.extend(i["indices"])
+        else:
+            # Store dense rows in the sparse matrix too.
+            if len(i) != numPredictors:
+                raise ValueError("Each row must have {0:d} predictors.".format(numPredictors))
+            data.extend(i)
+            indices.extend(range(len(i)))
+        indptr.append(len(indices))
+    return sparse.csr_matrix((numpy.array(data, dtype=numpy.float64), indices, indptr), shape=(len(rows), numPredictors))
+
+
+class ScoringHandler(http.server.BaseHTTPRequestHandler):
+    """Handle scoring requests.
+
+    POST /predict with a JSON body {"model": name, "row": row} or {"model": name, "rows": [row, ...]} returns
+    {"predictions": [[...], ...]}. GET /stats returns the latency and throughput counters.
+
+    """
+
+    def do_GET(self):
+        if self.path == "/stats":
+            self.send_json(200, self.server.batcher.stats())
+        else:
+            self.send_json(404, {"error": "Unknown path '{0:s}'.".format(self.path)})
+
+    def do_POST(self):
+        if self.path != "/predict":
+            self.send_json(404, {"error": "Unknown path '{0:s}'.".format(self.path)})
+            return
+        try:
+            body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+            if not (isinstance(body, dict) and isinstance(body.get("model"), str)):
+                raise ValueError("The request must be a JSON object with a \"model\" name.")
+            if isinstance(body.get("rows"), list):
+                rows = body["rows"]
+            elif "row" in body:
+                rows = [body["row"]]
+            else:
+                raise ValueError("The request must have either a \"row\" or a list of \"rows\".")
+            futures = [self.server.batcher.submit(body["model"], i) for i in rows]
+            with self.server.batcher.statsLock:
+                self.server.batcher.numRequests += 1
+            predictions = [i.result() for i in futures]
+        except UnknownModelError as error:
+            self.send_json(404, {"error": str(error)})
+            return
+        except Exception as error:
+            self.send_json(400, {"error": str(error)})
+            return
+        self.send_json(200, {"predictions": predictions})
+
+    def send_json(self, status, content):
+        response = json.dumps(content).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(response)))
+        self.end_headers()
+        self.wfile.write(response)
+
+    def log_message(self, format, *args):
+        pass  # Logging every request would dominate the cost of scoring it.
+
+
+def make_server(modelDirectory, host="127.0.0.1", port=8000, cacheCapacity=8, maxBatchSize=256, maxDelay=0.002):
+    """Create (but do not start) a scoring server.
+
+    :param modelDirectory:  The directory containing the models (saved by PLS.model_io.save_model as <name>.npz).
+    :type modelDirectory:   string
+    :param host:            The address to listen on.
+    :type host:             string
+    :param port:            The port to listen on (0 picks a free port).
+    :type port:             int
+    :param cacheCapacity:   The maximum number of models to keep loaded.
+    :type cacheCapacity:    int
+    :param maxBatchSize:    The maximum number of rows in a batch.
+    :type maxBatchSize:     int
+    :param maxDelay:        The maximum number of seconds to wait for a batch to fill.
+    :type maxDelay:         float
+    :return :               The server. Call serve_forever to start it.
+    :rtype :                http.server.ThreadingHTTPServer
+
+    """
+
+    server = http.server.ThreadingHTTPServer((host, port), ScoringHandler)
+    server.daemon_threads = True
+    server.batcher = MicroBatcher(ModelCache(modelDirectory, cacheCapacity), maxBatchSize, maxDelay)
+    return server
+
+
+def score(url, modelName, rows):
+    """Score rows using a running scoring server.
+
+    :param url:             The address of the server (e.g. http://127.0.0.1:8000).
+    :type url:              string
+    :param modelName:       The name of the model to score the rows with.
+    :type modelName:        string
+    :param rows:            The rows, each either dense (a list of values) or sparse (a dict with "indices" and
+                            "values").
+    :type rows:             list
+    :return :               The predicted responses for each row.
+    :rtype :                list of lists
+
+    """
+
+    request = urllib.request.Request(url + "/predict", data=json.dumps({"model": modelName, "rows": rows}).encode(),
+                                     headers={"Content-Type": "application/json"})
+    with urllib.request.urlopen(request) as response:
+        return json.loads(response.read())["predictions"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve predictions from saved PLS models.")
+    parser.add_argument("modelDirectory", help="Directory containing the models saved as <name>.npz.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--cache-capacity", type=int, default=8, help="Maximum number of models to keep loaded.")
+    parser.add_argument("--max-batch-size", type=int, default=256, help="Maximum number of rows in a batch.")
+    parser.add_argument("--max-delay", type=float, default=0.002, help="Maximum seconds to wait for a batch to fill.")
+    args = parser.parse_args()
+    server = make_server(args.modelDirectory, args.host, args.port, args.cache_capacity, args.max_batch_size, args.max_delay)
+    server.serve_forever()
+
+
+if __name__ == '__main__':
+    main()
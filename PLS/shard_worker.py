@@ -0,0 +1,161 @@
+import multiprocessing
+import numpy
+
+
+def shard_worker(connection, fileShard, sep='\t'):
+    """Serve requests against one row shard of the X matrix.
+
+    The shard is loaded once and kept in memory for as long as the worker lives. Requests are received on the
+    connection as (command, argument) tuples and the result of each is sent back on the same connection. The
+    commands understood are:
+        "shape"     -> the (rows, columns) of the shard
+        "cov"       -> X_shard.T * argument, where the argument is the rows of Y belonging to the shard
+        "component" -> (X_shard * argument, X_shard.T * (X_shard * argument)), where the argument is a weight vector r
+        "close"     -> stop serving requests
+    Each result is sent as a (isError, value) tuple. If loading the shard or answering a request raises an exception,
+    then the exception is sent back as the value (and re-raised by the transport) rather than killing the worker.
+
+    :param connection:      One end of a pipe (or any object exposing send and recv).
+    :type connection:       multiprocessing.connection.Connection
+    :param fileShard:       Location where the row shard of the X matrix has been saved.
+    :type fileShard:        string
+    :param sep:             The separator used between elements of the X matrix.
+    :type sep:              string
+
+    """
+
+    try:
+        shard = ShardHandler(fileShard, sep)
+        loadError = None
+    except Exception as error:
+        shard = None
+        loadError = error  # Reported in answer to every request, so the coordinator sees why the shard is unusable.
+    while True:
+        command, argument = connection.recv()
+        if command == "close":
+            break
+        if loadError is not None:
+            connection.send((True, loadError))
+            continue
+        try:
+            connection.send((False, shard.handle(command, argument)))
+        except Exception as error:
+            connection.send((True, error))
+    connection.close()
+
+
+class ShardHandler(object):
+    """Hold one row shard of the X matrix in memory and answer requests against it."""
+
+    def __init__(self, fileShard, sep='\t'):
+        """Load the shard.
+
+        :param fileShard:       Location where the row shard of the X matrix has been saved.
+        :type fileShard:        string
+        :param sep:             The separator used between elements of the X matrix.
+        :type sep:              string
+
+        """
+
+        self.shard = numpy.loadtxt(fileShard, delimiter=sep, ndmin=2)
+
+    def handle(self, command, argument):
+        """Answer a single request.
+
+        :param command:         The request to answer (see shard_worker for those available).
+        :type command:          string
+        :param argument:        The argument accompanying the request.
+        :type argument:         numpy array/matrix or None
+        :return :               The answer to the request.
+        :rtype :                tuple or numpy array
+
+        """
+
+        if command == "shape":
+            return self.shard.shape
+        elif command == "cov":
+            return (self.shard.T).dot(numpy.asarray(argument))
+        elif command == "component":
+            tShard = self.shard.dot(numpy.asarray(argument))
+            return tShard, (self.shard.T).dot(tShard)
+        raise ValueError("Unknown shard request '{0:s}'.".format(command))
+
+
+class SerialTransport(object):
+    """Answer shard requests one shard at a time in the current process.
+
+    Mainly useful for debugging, and as the reference implementation of the transport interface. A transport must
+    expose request(command, arguments), taking one argument per shard and returning one result per shard in the
+    same order, and close().
+
+    """
+
+    def __init__(self, shardFiles, sep='\t'):
+        self.handlers = [ShardHandler(i, sep) for i in shardFiles]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def request(self, command, arguments=None):
+        if arguments is None:
+            arguments = [None] * len(self.handlers)
+        return [i.handle(command, j) for i, j in zip(self.handlers, arguments)]
+
+    def close(self):
+        self.handlers = []
+
+
+class PipeTransport(object):
+    """Answer shard requests with one local worker process per shard, communicating over pipes.
+
+    Requests are sent to every worker before any result is collected, so the shards are processed in parallel.
+
+    """
+
+    def __init__(self, shardFiles, sep='\t'):
+        self.connections = []
+        self.workers = []
+        for i in shardFiles:
+            parentEnd, childEnd = multiprocessing.Pipe()
+            worker = multiprocessing.Process(target=shard_worker, args=(childEnd, i, sep))
+            worker.daemon = True
+            worker.start()
+            childEnd.close()  # Only the worker uses this end.
+            self.connections.append(parentEnd)
+            self.workers.append(worker)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def request(self, command, arguments=None):
+        if arguments is None:
+            arguments = [None] * len(self.connections)
+        for i, j in zip(self.connections, arguments):
+            i.send((command, j))
+        # Collect every answer before raising, so that the pipes are left ready for the next request.
+        results = [i.recv() for i in self.connections]
+        for isError, value in results:
+            if isError:
+                raise value
+        return [i[1] for i in results]
+
+    def close(self):
+        for i in self.connections:
+            try:
+                i.send(("close", None))
+            except (BrokenPipeError, OSError):
+                pass  # The worker has already exited.
+            i.close()
+        for i in self.workers:
+            i.join(timeout=5)
+            if i.is_alive():
+                i.terminate()
+                i.join()
+        self.connections = []
+        self.workers = []
@@ -1,9 +1,14 @@
 import numpy
 import PLS.dot_product
+import PLS.early_stopping
 import PLS.line_counter
+import PLS.output_arrays
+import PLS.shard_worker
+import PLS.sparsify
 
 
-def simpls_mem(X, Y, numberComponents=10):
+def simpls_mem(X, Y, numberComponents=10, sparsity=None, sparsityMethod="soft", outputLocation=None,
+               stoppingCriterion=None, stoppingTolerance=0.0, validationData=None):
     """Run the standard SIMPLS algorithm keeping the X matrix in memory.
 
     No error checking is performed (e.g. it is assumed that the first dimensions of X and Y are the same).
@@ -14,7 +19,25 @@ def simpls_mem(X, Y, numberComponents=10):
     :type Y:                    numpy.array
     :param numberComponents:    The number of components (latent variables) to use.
     :type numberComponents:     int
-    :returns :                  ....
+    :param sparsity:            The sparsity applied to the weights of each component (see PLS.sparsify.sparsify_weight).
+                                Either a single value used for every component or a list with one value per component.
+                                None gives the standard dense weights.
+    :type sparsity:             float, int, list or None
+    :param sparsityMethod:      The method used to make the weights sparse ("soft" or "topk").
+    :type sparsityMethod:       string
+    :param outputLocation:      Where to store the X loadings, X scores, Y scores and weights (see
+                                PLS.output_arrays.output_array). None keeps them in memory, True places them in
+                                temporary memory-mapped files, and a directory places them in memory-mapped files there.
+    :type outputLocation:       None, bool or string
+    :param stoppingCriterion:   The criterion used to stop extracting components before numberComponents have been
+                                extracted (see PLS.early_stopping.EarlyStopping). None always extracts them all.
+    :type stoppingCriterion:    string or None
+    :param stoppingTolerance:   The tolerance of the stopping criterion.
+    :type stoppingTolerance:    float
+    :param validationData:      The validation predictors and responses used by the "validation" stopping criterion,
+                                centered using the means of the training data.
+    :type validationData:       tuple of (numpy/scipy matrix, numpy array) or None
+    :returns :                  .... (with one column per component extracted)
     :rtype :                    ....
 
     """
@@ -32,38 +55,68 @@ def simpls_mem(X, Y, numberComponents=10):
         [numObservationsY, numResponses] = yDimensions
 
     # Initialise outputs.
-    xLoadings = numpy.matrix(numpy.zeros((numPredictors, numberComponents)))
+    xLoadings = PLS.output_arrays.output_array(numPredictors, numberComponents, outputLocation, "xLoadings")
         # Each row contains coefficients that define a linear combination of the components that approximate the original predictor variables.
         # The coefficients from regressing centred X, which we'll call X0, on the x scores: XL = (XS\X0)' = X0'*XS.
         # XS*XL' is the PLS approximation to X0.
-    xScores = numpy.matrix(numpy.zeros((numObservationsX, numberComponents)))
+    xScores = PLS.output_arrays.output_array(numObservationsX, numberComponents, outputLocation, "xScores")
         # The components that are linear combinations of the variables in X.
     yLoadings = numpy.matrix(numpy.zeros((numResponses, numberComponents)))
         # Each row contains coefficients that define a linear combination of PLS components that approximate the original response variables.
         # The coefficients from regressing centred Y, which we'll call Y0, on the x scores: YL = (XS\Y0)' = Y0'*XS.
         # XS*YL' is the PLS approximation to Y0.
-    yScores = numpy.matrix(numpy.zeros((numObservationsY, numberComponents)))
+    yScores = PLS.output_arrays.output_array(numObservationsY, numberComponents, outputLocation, "yScores")
         # The linear combinations of the responses with which the components xScore have maximum covariance.
-    weights = numpy.matrix(numpy.zeros((numPredictors, numberComponents)))
+    weights = PLS.output_arrays.output_array(numPredictors, numberComponents, outputLocation, "weights")
         # A p-by-ncomp matrix of PLS weights W so that XS = X0*W.
 
     # An orthonormal basis for the span of the X loadings, to make the successive deflation X0'*Y0 simple.
     # Each new basis vector can be removed from Cov separately.
-    V = numpy.matrix(numpy.zeros((numPredictors, numberComponents)))
+    # It is not returned, so it is only ever placed in a temporary file.
+    V = PLS.output_arrays.output_array(numPredictors, numberComponents, None if outputLocation is None else True)
+
+    # Determine the sparsity to apply to the weights of each component.
+    if not isinstance(sparsity, (list, tuple)):
+        sparsity = [sparsity] * numberComponents
+
+    # Determine when to stop extracting components.
+    stopping = PLS.early_stopping.EarlyStopping(stoppingCriterion, stoppingTolerance, Y, validationData)
+    numComponentsExtracted = numberComponents
 
     Cov = numpy.matrix((X.T).dot(Y))
     for i in range(numberComponents):
         # Find unit length ti=X0*ri and ui=Y0*ci whose covariance, ri'*X0'*Y0*ci, is
         # jointly maximized, subject to ti'*tj=0 for j=1:(i-1).
-        [R, S, C] = numpy.linalg.svd(Cov)
+        [R, S, C] = numpy.linalg.svd(Cov, full_matrices=False)
         r = numpy.matrix(R)[:, 0]
-        c = numpy.matrix(C)[:, 0]
+        c = numpy.matrix(C)[0, :].T
         s = S[0]  # First component
+        if stopping.stop_at_singular_value(s):
+            numComponentsExtracted = i
+            break
+        r = PLS.sparsify.sparsify_weight(r, sparsity[i], sparsityMethod)
         t = X.dot(r)
+        if sparsity[i] is not None:
+            # The sparse ri is no longer orthogonal to the previous X loadings, so ti is not orthogonal to the
+            # previous X scores. Orthogonalize ti with modified Gram Schmidt, repeated twice, making the same changes
+            # to ri so that ti=X0*ri still holds. The weights remain sparse (their support is the union of the supports
+            # of the sparse weights so far).
+            for j in range(2):
+                for k in range(i):
+                    tk = xScores[:, k]
+                    projection = (tk.T).dot(t)
+                    t = t - numpy.multiply(projection, tk)
+                    r = r - numpy.multiply(projection, weights[:, k])
         normT = numpy.linalg.norm(t)
         t = t / normT  # t' * t = 1
+        if sparsity[i] is None:
+            q = (s * c) / normT  # = Y0'*ti
+        else:
+            q = (Y.T).dot(t)  # ri is no longer the singular vector, so calculate Y0'*ti directly.
+        if stopping.stop_at_component(r / normT, q):
+            numComponentsExtracted = i
+            break
         xLoadings[:, i] = (X.T).dot(t)
-        q = (s * c) / normT  # = Y0'*ti
         yLoadings[:, i] = q
         xScores[:, i] = t
         yScores[:, i] = Y.dot(q)  # = Y0*(Y0'*ti), and proportional to Y0*ci
@@ -74,7 +127,7 @@ def simpls_mem(X, Y, numberComponents=10):
         v = xLoadings[:, i]
         for j in range(2):
             for k in range(i):
-                vj = V[:, j]
+                vj = V[:, k]
                 v = v - numpy.multiply((vj.T).dot(v), vj)
         v = v / numpy.linalg.norm(v)
         V[:, i] = v
@@ -93,7 +146,7 @@ def simpls_mem(X, Y, numberComponents=10):
     # consistent with the PLS-1/PLS-2 algorithms, where the Y scores are computed
     # as linear combinations of a successively-deflated Y0.  Use modified
     # Gram-Schmidt, repeated twice.
-    for i in range(numberComponents):
+    for i in range(numComponentsExtracted):
         u = yScores[:, i]
         for j in range(2):
             for k in range(i):
@@ -101,10 +154,13 @@ def simpls_mem(X, Y, numberComponents=10):
                 u = u - numpy.multiply((tj.T).dot(u), tj)
         yScores[:, i] = u
 
-    return xLoadings, yLoadings, xScores, yScores, weights
+    # Only return the components extracted.
+    k = numComponentsExtracted
+    return xLoadings[:, 0:k], yLoadings[:, 0:k], xScores[:, 0:k], yScores[:, 0:k], weights[:, 0:k]
 
 
-def simpls_file(fileX, fileXTrans, Y, numberComponents=10):
+def simpls_file(fileX, fileXTrans, Y, numberComponents=10, sparsity=None, sparsityMethod="soft",
+                 outputLocation=None, cache=None, stoppingCriterion=None, stoppingTolerance=0.0, validationData=None):
     """Run the standard SIMPLS algorithm via the filesystem.
 
     No error checking is performed (e.g. it is assumed that the first dimensions of X and Y are the same).
@@ -117,14 +173,43 @@ def simpls_file(fileX, fileXTrans, Y, numberComponents=10):
     :type Y:                    numpy.array
     :param numberComponents:    The number of components (latent variables) to use.
     :type numberComponents:     int
-    :returns :                  ....
+    :param sparsity:            The sparsity applied to the weights of each component (see PLS.sparsify.sparsify_weight).
+                                Either a single value used for every component or a list with one value per component.
+                                None gives the standard dense weights.
+    :type sparsity:             float, int, list or None
+    :param sparsityMethod:      The method used to make the weights sparse ("soft" or "topk").
+    :type sparsityMethod:       string
+    :param outputLocation:      Where to store the X loadings, X scores, Y scores and weights (see
+                                PLS.output_arrays.output_array). None keeps them in memory, True places them in
+                                temporary memory-mapped files, and a directory places them in memory-mapped files there.
+    :type outputLocation:       None, bool or string
+    :param cache:               A cache of statistics of the X matrix. The shape of X is taken from the cache rather
+                                than by counting lines. If the cache holds X0'*X0, then it replaces both scans of X made
+                                for each component, with the X scores calculated in a single scan at the end.
+    :type cache:                PLS.file_cache.FileStatisticsCache or None
+    :param stoppingCriterion:   The criterion used to stop extracting components before numberComponents have been
+                                extracted (see PLS.early_stopping.EarlyStopping). None always extracts them all.
+    :type stoppingCriterion:    string or None
+    :param stoppingTolerance:   The tolerance of the stopping criterion.
+    :type stoppingTolerance:    float
+    :param validationData:      The validation predictors and responses used by the "validation" stopping criterion,
+                                centered using the means of the training data.
+    :type validationData:       tuple of (numpy/scipy matrix, numpy array) or None
+    :returns :                  .... (with one column per component extracted)
     :rtype :                    ....
 
     """
 
     # Determine the dimensions of the X matrix.
-    numObservationsX = PLS.line_counter.line_counter(fileX)
-    numPredictors = PLS.line_counter.line_counter(fileXTrans)
+    if cache is None:
+        numObservationsX = PLS.line_counter.line_counter(fileX)
+        numPredictors = PLS.line_counter.line_counter(fileXTrans)
+        gram = None
+    else:
+        statistics = cache.statistics(fileX)
+        numObservationsX = statistics["numObservations"]
+        numPredictors = statistics["numPredictors"]
+        gram = statistics["gram"]
 
     # Determine the dimensions of the Y matrix.
     yDimensions = Y.shape
@@ -138,40 +223,91 @@ def simpls_file(fileX, fileXTrans, Y, numberComponents=10):
         [numObservationsY, numResponses] = yDimensions
 
     # Initialise outputs.
-    xLoadings = numpy.matrix(numpy.zeros((numPredictors, numberComponents)))
+    xLoadings = PLS.output_arrays.output_array(numPredictors, numberComponents, outputLocation, "xLoadings")
         # Each row contains coefficients that define a linear combination of the components that approximate the original predictor variables.
         # The coefficients from regressing centred X, which we'll call X0, on the x scores: XL = (XS\X0)' = X0'*XS.
         # XS*XL' is the PLS approximation to X0.
-    xScores = numpy.matrix(numpy.zeros((numObservationsX, numberComponents)))
+    xScores = PLS.output_arrays.output_array(numObservationsX, numberComponents, outputLocation, "xScores")
         # The components that are linear combinations of the variables in X.
     yLoadings = numpy.matrix(numpy.zeros((numResponses, numberComponents)))
         # Each row contains coefficients that define a linear combination of PLS components that approximate the original response variables.
         # The coefficients from regressing centred Y, which we'll call Y0, on the x scores: YL = (XS\Y0)' = Y0'*XS.
         # XS*YL' is the PLS approximation to Y0.
-    yScores = numpy.matrix(numpy.zeros((numObservationsY, numberComponents)))
+    yScores = PLS.output_arrays.output_array(numObservationsY, numberComponents, outputLocation, "yScores")
         # The linear combinations of the responses with which the components xScore have maximum covariance.
-    weights = numpy.matrix(numpy.zeros((numPredictors, numberComponents)))
+    weights = PLS.output_arrays.output_array(numPredictors, numberComponents, outputLocation, "weights")
         # A p-by-ncomp matrix of PLS weights W so that XS = X0*W.
 
     # An orthonormal basis for the span of the X loadings, to make the successive deflation X0'*Y0 simple.
     # Each new basis vector can be removed from Cov separately.
-    V = numpy.matrix(numpy.zeros((numPredictors, numberComponents)))
+    # It is not returned, so it is only ever placed in a temporary file.
+    V = PLS.output_arrays.output_array(numPredictors, numberComponents, None if outputLocation is None else True)
+
+    # Determine the sparsity to apply to the weights of each component.
+    if not isinstance(sparsity, (list, tuple)):
+        sparsity = [sparsity] * numberComponents
+
+    # Determine when to stop extracting components.
+    stopping = PLS.early_stopping.EarlyStopping(stoppingCriterion, stoppingTolerance, Y, validationData)
+    numComponentsExtracted = numberComponents
 
     Cov = PLS.dot_product.dot_product(fileXTrans, numPredictors, Y)
+    if gram is not None:
+        # With X0'*X0 available, Y0'*ti = (X0'*Y0)'*ri can be calculated from the undeflated Cov.
+        covXY = Cov
     for i in range(numberComponents):
         # Find unit length ti=X0*ri and ui=Y0*ci whose covariance, ri'*X0'*Y0*ci, is
         # jointly maximized, subject to ti'*tj=0 for j=1:(i-1).
-        [R, S, C] = numpy.linalg.svd(Cov)
+        [R, S, C] = numpy.linalg.svd(Cov, full_matrices=False)
         r = numpy.matrix(R)[:, 0]
-        c = numpy.matrix(C)[:, 0]
+        c = numpy.matrix(C)[0, :].T
         s = S[0]  # First component
-        t = PLS.dot_product.dot_product(fileX, numObservationsX, r)
-        normT = numpy.linalg.norm(t)
-        t = t / normT  # t' * t = 1
-        xLoadings[:, i] = PLS.dot_product.dot_product(fileXTrans, numPredictors, t)
-        q = (s * c) / normT  # = Y0'*ti
+        if stopping.stop_at_singular_value(s):
+            numComponentsExtracted = i
+            break
+        r = PLS.sparsify.sparsify_weight(r, sparsity[i], sparsityMethod)
+        if gram is None:
+            t = PLS.dot_product.dot_product(fileX, numObservationsX, r)
+            if sparsity[i] is not None:
+                # The sparse ri is no longer orthogonal to the previous X loadings, so ti is not orthogonal to the
+                # previous X scores. Orthogonalize ti with modified Gram Schmidt, repeated twice, making the same changes
+                # to ri so that ti=X0*ri still holds. The weights remain sparse (their support is the union of the supports
+                # of the sparse weights so far).
+                for j in range(2):
+                    for k in range(i):
+                        tk = xScores[:, k]
+                        projection = (tk.T).dot(t)
+                        t = t - numpy.multiply(projection, tk)
+                        r = r - numpy.multiply(projection, weights[:, k])
+            normT = numpy.linalg.norm(t)
+            t = t / normT  # t' * t = 1
+        else:
+            # Use X0'*X0 in place of scanning X. As tk=X0*wk, tk'*X0*ri = wk'*X0'*X0*ri, and X0'*ti = X0'*X0*ri / norm(X0*ri).
+            if sparsity[i] is not None:
+                # Orthogonalize ti against the previous X scores, as above.
+                for j in range(2):
+                    for k in range(i):
+                        wk = weights[:, k]
+                        projection = (wk.T).dot(gram.dot(r))
+                        r = r - numpy.multiply(projection, wk)
+            gramR = gram.dot(r)
+            normT = numpy.sqrt((r.T).dot(gramR)[0, 0])
+        if sparsity[i] is None:
+            q = (s * c) / normT  # = Y0'*ti
+        elif gram is None:
+            q = (Y.T).dot(t)  # ri is no longer the singular vector, so calculate Y0'*ti directly.
+        else:
+            q = (covXY.T).dot(r) / normT  # = Y0'*X0*ri / norm(X0*ri)
+        if stopping.stop_at_component(r / normT, q):
+            numComponentsExtracted = i
+            break
+        if gram is None:
+            # Only scan X for the loadings once the component is known to be kept.
+            xLoadings[:, i] = PLS.dot_product.dot_product(fileXTrans, numPredictors, t)
+            xScores[:, i] = t
+        else:
+            xLoadings[:, i] = gramR / normT
         yLoadings[:, i] = q
-        xScores[:, i] = t
         yScores[:, i] = Y.dot(q)  # = Y0*(Y0'*ti), and proportional to Y0*ci
         weights[:, i] = r / normT  # rescaled to make ri'*X0'*X0*ri == ti'*ti == 1
 
@@ -180,7 +316,7 @@ def simpls_file(fileX, fileXTrans, Y, numberComponents=10):
         v = xLoadings[:, i]
         for j in range(2):
             for k in range(i):
-                vj = V[:, j]
+                vj = V[:, k]
                 v = v - numpy.multiply((vj.T).dot(v), vj)
         v = v / numpy.linalg.norm(v)
         V[:, i] = v
@@ -193,12 +329,220 @@ def simpls_file(fileX, fileXTrans, Y, numberComponents=10):
         Vi = V[:, 0:i+1]
         Cov = Cov - Vi.dot((Vi.T).dot(Cov))
 
+    if gram is not None:
+        # Calculate all of the X scores in a single scan of X, storing them directly in xScores a block of rows at a
+        # time (so that no n x k copy is made when xScores is stored in a file).
+        PLS.dot_product.dot_product(fileX, numObservationsX, weights[:, 0:numComponentsExtracted],
+                                    out=xScores[:, 0:numComponentsExtracted])
+
     # By convention, orthogonalize the Y scores w.r.t. the preceding Xscores,
     # i.e. XSCORES'*YSCORES will be lower triangular.  This gives, in effect, only
     # the "new" contribution to the Y scores for each PLS component.  It is also
     # consistent with the PLS-1/PLS-2 algorithms, where the Y scores are computed
     # as linear combinations of a successively-deflated Y0.  Use modified
     # Gram-Schmidt, repeated twice.
+    for i in range(numComponentsExtracted):
+        u = yScores[:, i]
+        for j in range(2):
+            for k in range(i):
+                tj = xScores[:, k]
+                u = u - numpy.multiply((tj.T).dot(u), tj)
+        yScores[:, i] = u
+
+    # Only return the components extracted.
+    k = numComponentsExtracted
+    return xLoadings[:, 0:k], yLoadings[:, 0:k], xScores[:, 0:k], yScores[:, 0:k], weights[:, 0:k]
+
+
+def simpls_file_batch(fileX, fileXTrans, Y, numberComponents=10):
+    """Run the standard SIMPLS algorithm via the filesystem for many independent PLS1 targets at once.
+
+    Each column of Y is treated as a separate PLS1 problem. The fits advance in lockstep, so that each scan of X
+    calculates X0*ri (or X0'*ti) for every target as a single multi-column product. The number of scans of X is
+    therefore independent of the number of targets.
+
+    For PLS1, Cov is a single column, so its SVD is simply ri = Cov / norm(Cov) with singular value norm(Cov).
+
+    No error checking is performed (e.g. it is assumed that the first dimensions of X and Y are the same).
+
+    :param fileX:               The location where the X matrix has been saved.
+    :type fileX:                string
+    :param fileXTrans:          The location where the transpose of the X matrix has been saved.
+    :type fileXTrans:           string
+    :param Y:                   The n x m matrix of responses, with one independent target in each column.
+    :type Y:                    numpy.array
+    :param numberComponents:    The number of components (latent variables) to use.
+    :type numberComponents:     int
+    :returns :                  The xLoadings, yLoadings, xScores, yScores and weights for each target (as returned by
+                                simpls_file when run with that target alone).
+    :rtype :                    list of tuples of numpy matrices
+
+    """
+
+    # Determine the dimensions of the X matrix.
+    numObservationsX = PLS.line_counter.line_counter(fileX)
+    numPredictors = PLS.line_counter.line_counter(fileXTrans)
+
+    # Determine the dimensions of the Y matrix.
+    Y = numpy.asarray(Y)
+    if len(Y.shape) == 1:
+        Y = Y.reshape(Y.shape[0], 1)  # Ensure that Y is a column vector.
+    [numObservationsY, numTargets] = Y.shape
+
+    # Initialise outputs. The last dimension of each indexes the target.
+    xLoadings = numpy.zeros((numPredictors, numberComponents, numTargets))
+    xScores = numpy.zeros((numObservationsX, numberComponents, numTargets))
+    yLoadings = numpy.zeros((numberComponents, numTargets))
+    yScores = numpy.zeros((numObservationsY, numberComponents, numTargets))
+    weights = numpy.zeros((numPredictors, numberComponents, numTargets))
+
+    # An orthonormal basis for the span of the X loadings of each target.
+    V = numpy.zeros((numPredictors, numberComponents, numTargets))
+
+    # Column j of Cov is X0'*Y0 for target j.
+    Cov = numpy.asarray(PLS.dot_product.dot_product(fileXTrans, numPredictors, Y))
+    for i in range(numberComponents):
+        # The SVD of each single column Cov.
+        s = numpy.linalg.norm(Cov, axis=0)
+        R = Cov / s
+        T = numpy.asarray(PLS.dot_product.dot_product(fileX, numObservationsX, R))
+        normT = numpy.linalg.norm(T, axis=0)
+        T = T / normT  # t' * t = 1
+        xLoadings[:, i, :] = PLS.dot_product.dot_product(fileXTrans, numPredictors, T)
+        q = s / normT  # = Y0'*ti
+        yLoadings[i, :] = q
+        xScores[:, i, :] = T
+        yScores[:, i, :] = Y * q  # = Y0*(Y0'*ti)
+        weights[:, i, :] = R / normT  # rescaled to make ri'*X0'*X0*ri == ti'*ti == 1
+
+        # Update the orthonormal bases with modified Gram Schmidt (more stable),
+        # repeated twice (ditto).
+        v = xLoadings[:, i, :]
+        for j in range(2):
+            for k in range(i):
+                vj = V[:, k, :]
+                v = v - vj * numpy.sum(vj * v, axis=0)
+        v = v / numpy.linalg.norm(v, axis=0)
+        V[:, i, :] = v
+
+        # Deflate Cov, i.e. project each target's column onto the ortho-complement of its X loadings.
+        Cov = Cov - v * numpy.sum(v * Cov, axis=0)
+        Vi = V[:, 0:i+1, :]
+        Cov = Cov - numpy.einsum('pkm,km->pm', Vi, numpy.einsum('pkm,pm->km', Vi, Cov))
+
+    # By convention, orthogonalize the Y scores w.r.t. the preceding Xscores using modified Gram-Schmidt,
+    # repeated twice (see simpls_mem).
+    for i in range(numberComponents):
+        u = yScores[:, i, :]
+        for j in range(2):
+            for k in range(i):
+                tj = xScores[:, k, :]
+                u = u - tj * numpy.sum(tj * u, axis=0)
+        yScores[:, i, :] = u
+
+    return [(numpy.matrix(xLoadings[:, :, i]), numpy.matrix(yLoadings[:, i]), numpy.matrix(xScores[:, :, i]),
+             numpy.matrix(yScores[:, :, i]), numpy.matrix(weights[:, :, i])) for i in range(numTargets)]
+
+
+def simpls_sharded(shardFiles, Y, numberComponents=10, transport=None):
+    """Run the standard SIMPLS algorithm with X split into row shards held by workers.
+
+    Each worker keeps its shard of the X matrix resident and answers requests for X_shard*r and X_shard'*t_shard,
+    while the SVD, Gram Schmidt and deflation are performed here. Both products for a component are answered by a
+    worker in a single request, so each component costs one parallel round instead of two scans of X.
+
+    No error checking is performed (e.g. it is assumed that the first dimensions of X and Y are the same).
+
+    :param shardFiles:          The locations where the row shards of the X matrix have been saved (in row order).
+    :type shardFiles:           list of strings
+    :param Y:                   The n x m matrix of responses.
+    :type Y:                    numpy.array
+    :param numberComponents:    The number of components (latent variables) to use.
+    :type numberComponents:     int
+    :param transport:           The transport used to communicate with the workers. Defaults to one local process
+                                per shard communicating over pipes (PLS.shard_worker.PipeTransport).
+    :type transport:            object exposing request(command, arguments) and close()
+    :returns :                  ....
+    :rtype :                    ....
+
+    """
+
+    isTransportOwned = transport is None
+    if isTransportOwned:
+        transport = PLS.shard_worker.PipeTransport(shardFiles)
+
+    try:
+        # Determine the dimensions of the X matrix, and which rows of it each shard holds.
+        shardShapes = transport.request("shape")
+        shardStarts = numpy.cumsum([0] + [i[0] for i in shardShapes])
+        numObservationsX = int(shardStarts[-1])
+        numPredictors = shardShapes[0][1]
+
+        # Determine the dimensions of the Y matrix.
+        yDimensions = Y.shape
+        if len(yDimensions) == 1:
+            # There is only one response variable (PLS1).
+            numObservationsY = Y.shape[0]
+            numResponses = 1
+            Y = Y.reshape(numObservationsY, 1)  # Ensure that Y is a column vector.
+        else:
+            # There are multiple response variables (PLS2).
+            [numObservationsY, numResponses] = yDimensions
+
+        # Initialise outputs.
+        xLoadings = numpy.matrix(numpy.zeros((numPredictors, numberComponents)))
+        xScores = numpy.matrix(numpy.zeros((numObservationsX, numberComponents)))
+        yLoadings = numpy.matrix(numpy.zeros((numResponses, numberComponents)))
+        yScores = numpy.matrix(numpy.zeros((numObservationsY, numberComponents)))
+        weights = numpy.matrix(numpy.zeros((numPredictors, numberComponents)))
+
+        # An orthonormal basis for the span of the X loadings, to make the successive deflation X0'*Y0 simple.
+        V = numpy.matrix(numpy.zeros((numPredictors, numberComponents)))
+
+        # Each shard contributes X_shard'*Y_shard to X0'*Y0.
+        yShards = [Y[shardStarts[i]:shardStarts[i + 1]] for i in range(len(shardShapes))]
+        Cov = numpy.matrix(sum(transport.request("cov", yShards)))
+        for i in range(numberComponents):
+            # Find unit length ti=X0*ri and ui=Y0*ci whose covariance, ri'*X0'*Y0*ci, is
+            # jointly maximized, subject to ti'*tj=0 for j=1:(i-1).
+            [R, S, C] = numpy.linalg.svd(Cov, full_matrices=False)
+            r = numpy.matrix(R)[:, 0]
+            c = numpy.matrix(C)[0, :].T
+            s = S[0]  # First component
+
+            # Each shard returns its rows of X0*ri and its contribution to X0'*X0*ri.
+            # As the normalisation of ti is linear, it can be applied once the results are gathered.
+            shardResults = transport.request("component", [r] * len(shardShapes))
+            t = numpy.matrix(numpy.vstack([j[0] for j in shardResults]))
+            normT = numpy.linalg.norm(t)
+            t = t / normT  # t' * t = 1
+            xLoadings[:, i] = sum(j[1] for j in shardResults) / normT
+            q = (s * c) / normT  # = Y0'*ti
+            yLoadings[:, i] = q
+            xScores[:, i] = t
+            yScores[:, i] = Y.dot(q)  # = Y0*(Y0'*ti), and proportional to Y0*ci
+            weights[:, i] = r / normT  # rescaled to make ri'*X0'*X0*ri == ti'*ti == 1
+
+            # Update the orthonormal basis with modified Gram Schmidt (more stable),
+            # repeated twice (ditto).
+            v = xLoadings[:, i]
+            for j in range(2):
+                for k in range(i):
+                    vj = V[:, k]
+                    v = v - numpy.multiply((vj.T).dot(v), vj)
+            v = v / numpy.linalg.norm(v)
+            V[:, i] = v
+
+            # Deflate Cov, i.e. project onto the ortho-complement of the X loadings.
+            Cov = Cov - numpy.multiply(v, (v.T).dot(Cov))
+            Vi = V[:, 0:i+1]
+            Cov = Cov - Vi.dot((Vi.T).dot(Cov))
+    finally:
+        if isTransportOwned:
+            transport.close()
+
+    # By convention, orthogonalize the Y scores w.r.t. the preceding Xscores using modified Gram-Schmidt,
+    # repeated twice (see simpls_mem).
     for i in range(numberComponents):
         u = yScores[:, i]
         for j in range(2):
@@ -207,4 +551,4 @@ def simpls_file(fileX, fileXTrans, Y, numberComponents=10):
                 u = u - numpy.multiply((tj.T).dot(u), tj)
         yScores[:, i] = u
 
-    return xLoadings, yLoadings, xScores, yScores, weights
\ No newline at end of file
+    return xLoadings, yLoadings, xScores, yScores, weights
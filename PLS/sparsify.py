@@ -0,0 +1,70 @@
+import numbers
+import numpy
+
+
+def sparsify_weight(r, sparsity, sparsityMethod="soft"):
+    """Make a weight vector sparse.
+
+    Two methods of sparsifying the weight vector are available:
+        "soft" -> soft-threshold the weights, shrinking each towards zero by sparsity * max(abs(r))
+                  (sparsity is therefore a float in [0, 1), with 0 leaving the weights unchanged)
+        "topk" -> keep the sparsity weights with the largest magnitude and set the rest to zero
+                  (sparsity is therefore an int of at least one)
+    The sparse weight vector is rescaled to have unit length.
+
+    :param r:                   The p x 1 weight vector.
+    :type r:                    numpy matrix
+    :param sparsity:            The amount of sparsity to apply (see above). None leaves the weights unchanged.
+    :type sparsity:             float, int or None
+    :param sparsityMethod:      The method used to make the weights sparse ("soft" or "topk").
+    :type sparsityMethod:       string
+    :return :                   The sparse weight vector.
+    :rtype :                    numpy matrix
+
+    """
+
+    if sparsity is None:
+        return r
+    if (sparsityMethod in ("soft", "topk")) and not is_valid_sparsity(sparsity, sparsityMethod):
+        raise ValueError("Invalid sparsity {0!r} for the sparsity method '{1!s}'.".format(sparsity, sparsityMethod))
+
+    absR = numpy.abs(numpy.asarray(r)).ravel()
+    if sparsityMethod == "soft":
+        # Shrink every weight towards zero, setting those smaller than the threshold to zero.
+        # The threshold is relative to the largest weight, so at least one weight always survives.
+        threshold = sparsity * absR.max()
+        r = numpy.multiply(numpy.sign(r), numpy.maximum(numpy.abs(r) - threshold, 0))
+    elif sparsityMethod == "topk":
+        # Zero all but the largest sparsity weights.
+        if sparsity < absR.shape[0]:
+            removed = numpy.argpartition(absR, -sparsity)[:-sparsity]
+            r = r.copy()
+            r[removed] = 0
+    else:
+        raise ValueError("Unknown sparsity method '{0:s}'.".format(sparsityMethod))
+
+    return r / numpy.linalg.norm(r)
+
+
+def is_valid_sparsity(sparsity, sparsityMethod="soft"):
+    """Determine whether a sparsity is allowed for a sparsity method.
+
+    :param sparsity:            The amount of sparsity to apply (see sparsify_weight).
+    :type sparsity:             float, int or None
+    :param sparsityMethod:      The method used to make the weights sparse ("soft" or "topk").
+    :type sparsityMethod:       string
+    :return :                   Whether the sparsity is allowed (unknown methods allow no sparsity other than None).
+    :rtype :                    bool
+
+    """
+
+    if sparsity is None:
+        return True
+    if isinstance(sparsity, bool):
+        return False
+    if sparsityMethod == "soft":
+        # A sparsity of one or more would zero every weight.
+        return isinstance(sparsity, numbers.Real) and (0 <= sparsity < 1)
+    if sparsityMethod == "topk":
+        return isinstance(sparsity, numbers.Integral) and (sparsity >= 1)
+    return False
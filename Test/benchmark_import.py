@@ -0,0 +1,22 @@
+import subprocess
+import sys
+
+
+def time_import(code, repeats=20):
+    """Determine the median time, in seconds, for a new interpreter to run code (mostly the cost of its imports)."""
+
+    times = []
+    for i in range(repeats):
+        output = subprocess.check_output([sys.executable, "-c", "import time\nstart = time.perf_counter()\n" + code + "\nprint(time.perf_counter() - start)"])
+        times.append(float(output.decode().strip().splitlines()[-1]))
+    return sorted(times)[len(times) // 2]
+
+
+if __name__ == '__main__':
+    # Track the startup cost of a short-lived scoring job against that of importing the fitting code.
+    benchmarks = [("numpy", "import numpy"),
+                  ("PLS", "import PLS"),
+                  ("PLS scoring (load_model, predict)", "import PLS\nPLS.load_model\nPLS.predict"),
+                  ("PLS.main (fitting)", "import PLS.main")]
+    for name, code in benchmarks:
+        print("{0:40s}{1:8.1f} ms".format(name, 1000 * time_import(code)))
@@ -1,4 +1,6 @@
+import multiprocessing
 import numpy
+import os
 import PLS.center_and_store
 from scipy import sparse
 import unittest
@@ -22,7 +24,50 @@ class CompletionTests(unittest.TestCase):
 class CorrectnessTests(unittest.TestCase):
     """Tests checking the correctness of the output."""
 
-    pass
+    def check_saved(self, matrix, **kwargs):
+        fileMatrix = "TestMatrixCentered.txt"
+        fileMatrixTrans = "TestMatrixTransCentered.txt"
+        sumSquares = PLS.center_and_store.center_and_store(matrix, fileMatrix, fileMatrixTrans, **kwargs)
+        centered = numpy.asarray(matrix - matrix.mean(axis=0))
+        self.assertTrue(numpy.allclose(numpy.loadtxt(fileMatrix, delimiter='\t', ndmin=2), centered))
+        self.assertTrue(numpy.allclose(numpy.loadtxt(fileMatrixTrans, delimiter='\t', ndmin=2), centered.T))
+        self.assertAlmostEqual(sumSquares, numpy.square(centered).sum())
+        os.remove(fileMatrix)
+        os.remove(fileMatrixTrans)
+
+    def test_saved_matrices(self):
+        self.check_saved(numpy.random.rand(4, 5))
+        self.check_saved(numpy.random.rand(6, 3), isParallel=False)
+
+    def test_saved_sparse_matrices(self):
+        matrix = numpy.random.rand(20, 7) * (numpy.random.rand(20, 7) > 0.6)
+        self.check_saved(sparse.csr_matrix(matrix))
+        self.check_saved(sparse.csc_matrix(matrix), isParallel=False)
+
+    def test_saved_in_blocks(self):
+        # Force blocks of three rows, and therefore several temporary files to be joined.
+        matrix = numpy.random.rand(20, 7)
+        self.check_saved(matrix, memoryLimit=3 * 16 * 7)
+        self.check_saved(sparse.csr_matrix(matrix), memoryLimit=3 * 16 * 7, isParallel=False)
+
+    def test_joined_in_groups(self):
+        matrix = numpy.random.rand(20, 7)
+        fileMatrixTrans = "TestMatrixTransCentered.txt"
+        PLS.center_and_store.write_centered_columns(matrix, matrix.mean(axis=0), fileMatrixTrans, 2, maxOpenFiles=3)
+        self.assertTrue(numpy.allclose(numpy.loadtxt(fileMatrixTrans, delimiter='\t'), (matrix - matrix.mean(axis=0)).T))
+        os.remove(fileMatrixTrans)
+
+    def test_failed_transpose_stops_row_writer(self):
+        if "fork" not in multiprocessing.get_all_start_methods():
+            self.skipTest("The rows are only written in parallel when processes can be forked.")
+        fileMatrix = "TestMatrixCentered.txt"
+        with self.assertRaises(OSError):
+            PLS.center_and_store.center_and_store(numpy.random.rand(20, 7), fileMatrix,
+                                                  os.path.join("MissingDirectory", "TestMatrixTransCentered.txt"),
+                                                  memoryLimit=3 * 16 * 7, isParallel=True)
+        self.assertEqual(multiprocessing.active_children(), [])
+        if os.path.exists(fileMatrix):
+            os.remove(fileMatrix)
 
 
 if __name__ == '__main__':
@@ -0,0 +1,57 @@
+import numpy
+import PLS.diagnostics
+import PLS.simpls
+from scipy import sparse
+import unittest
+
+
+class DiagnosticsTests(unittest.TestCase):
+    """Tests checking the diagnostics calculated after fitting."""
+
+    @classmethod
+    def setUpClass(cls):
+        """Setup inputs needed for tests in the class."""
+
+        cls.X = numpy.random.rand(30, 12)
+        cls.X[cls.X < 0.5] = 0
+        cls.Y = numpy.random.rand(30, 2)
+
+    def test_total_sum_squares(self):
+        expected = numpy.square(self.X - self.X.mean(axis=0)).sum()
+        self.assertAlmostEqual(PLS.diagnostics.total_sum_squares(self.X), expected)
+        self.assertAlmostEqual(PLS.diagnostics.total_sum_squares(sparse.csr_matrix(self.X)), expected)
+        self.assertAlmostEqual(PLS.diagnostics.total_sum_squares(sparse.csc_matrix(self.X)), expected)
+        self.assertAlmostEqual(PLS.diagnostics.total_sum_squares(self.Y[:, 0]), numpy.var(self.Y[:, 0]) * 30)
+
+    def test_total_sum_squares_large_mean(self):
+        # Subtracting n * sum(mean^2) from sum(X^2) would cancel almost every significant digit here.
+        expected = numpy.square(self.X - self.X.mean(axis=0)).sum()
+        for offset in (1e7, 1e8):
+            X = self.X + offset
+            self.assertAlmostEqual(PLS.diagnostics.total_sum_squares(X), expected, places=5)
+            self.assertAlmostEqual(PLS.diagnostics.total_sum_squares(sparse.csr_matrix(X)), expected, places=5)
+
+    def test_variance_explained(self):
+        # With as many components as predictors, all of the variance of X is explained.
+        X = self.X - self.X.mean(axis=0)
+        Y = self.Y - self.Y.mean(axis=0)
+        xLoadings = PLS.simpls.simpls_mem(X, Y, 12)[0]
+        xVarExp = PLS.diagnostics.variance_explained(xLoadings, PLS.diagnostics.total_sum_squares(X))
+        self.assertEqual(xVarExp.shape, (12,))
+        self.assertAlmostEqual(xVarExp.sum(), 1)
+
+    def test_vip(self):
+        # The mean of the squared VIP scores is always one.
+        X = self.X - self.X.mean(axis=0)
+        Y = self.Y - self.Y.mean(axis=0)
+        xLoadings, yLoadings, xScores, yScores, weights = PLS.simpls.simpls_mem(X, Y, 3)
+        vipScores = PLS.diagnostics.vip(weights, yLoadings)
+        self.assertEqual(vipScores.shape, (12,))
+        self.assertAlmostEqual(numpy.square(vipScores).mean(), 1)
+
+    def test_q_squared(self):
+        self.assertTrue(numpy.allclose(PLS.diagnostics.q_squared([5, 2.5], 10), [0.5, 0.75]))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -49,6 +49,20 @@ class DotProductTests(unittest.TestCase):
         # Output result.
         self.assertTrue(all(comparisons))
 
+    def test_out(self):
+        """Test storing the dot product in a provided matrix, a block of rows at a time."""
+
+        matrix = numpy.random.rand(10, 6)
+        weights = numpy.random.rand(6, 3)
+        fileMatrix = "TestMatrixDotOut.txt"
+        numpy.savetxt(fileMatrix, matrix, delimiter='\t')
+        out = numpy.zeros((10, 4))
+        result = PLS.dot_product.dot_product(fileMatrix, 10, weights, out=out[:, 1:], rowsPerBlock=4)
+        os.remove(fileMatrix)
+        self.assertTrue(numpy.allclose(out[:, 1:], matrix.dot(weights), rtol=0, atol=1e-10))
+        self.assertTrue(numpy.all(out[:, 0] == 0))
+        self.assertTrue(numpy.shares_memory(result, out))
+
 
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,83 @@
+import numpy
+import os
+import PLS.early_stopping
+import PLS.main
+import PLS.simpls
+import unittest
+
+
+class EarlyStoppingTests(unittest.TestCase):
+    """Tests checking that SIMPLS stops extracting components once the stopping criterion is met."""
+
+    @classmethod
+    def setUpClass(cls):
+        """Setup inputs needed for tests in the class."""
+
+        # X and Y both depend on the same two latent variables (plus a little noise), so components after the second
+        # only fit the noise.
+        generator = numpy.random.default_rng(0)
+        latent = generator.standard_normal((80, 2))
+        X = latent.dot(generator.standard_normal((2, 10))) + 0.05 * generator.standard_normal((80, 10))
+        Y = latent.dot(generator.standard_normal((2, 2))) + 0.05 * generator.standard_normal((80, 2))
+        cls.XTrain = X[:60] - X[:60].mean(axis=0)
+        cls.YTrain = Y[:60] - Y[:60].mean(axis=0)
+        cls.validationData = (X[60:] - X[:60].mean(axis=0), Y[60:] - Y[:60].mean(axis=0))
+
+    def check_stops(self, criterion, tolerance):
+        allResults = PLS.simpls.simpls_mem(self.XTrain, self.YTrain, 8)
+        results = PLS.simpls.simpls_mem(self.XTrain, self.YTrain, 8, stoppingCriterion=criterion,
+                                        stoppingTolerance=tolerance, validationData=self.validationData)
+        numComponents = results[0].shape[1]
+        self.assertEqual(numComponents, 2)
+        for i, j in zip(allResults, results):
+            # The components extracted are the same as those without stopping early.
+            self.assertEqual(j.shape[1], numComponents)
+            self.assertTrue(numpy.allclose(i[:, 0:numComponents], j, rtol=0, atol=1e-10))
+        return numComponents
+
+    def test_singular_value(self):
+        self.check_stops("singularValue", 0.01)
+
+    def test_y_variance(self):
+        self.check_stops("yVariance", 0.001)
+
+    def test_validation(self):
+        self.check_stops("validation", 0.01)
+
+    def test_file(self):
+        fileMatrix = "TestMatrixStopping.txt"
+        fileMatrixTrans = "TestMatrixTransStopping.txt"
+        numpy.savetxt(fileMatrix, self.XTrain, delimiter='\t')
+        numpy.savetxt(fileMatrixTrans, self.XTrain.T, delimiter='\t')
+        memResults = PLS.simpls.simpls_mem(self.XTrain, self.YTrain, 8, stoppingCriterion="yVariance", stoppingTolerance=0.001)
+        fileResults = PLS.simpls.simpls_file(fileMatrix, fileMatrixTrans, self.YTrain, 8, stoppingCriterion="yVariance", stoppingTolerance=0.001)
+        os.remove(fileMatrix)
+        os.remove(fileMatrixTrans)
+        for i, j in zip(memResults, fileResults):
+            self.assertTrue(numpy.allclose(i, j, rtol=0, atol=1e-10))
+
+    def test_pls(self):
+        result = PLS.main.pls(self.XTrain, self.YTrain, 8, stoppingCriterion="validation", stoppingTolerance=0.01,
+                              validationData=self.validationData)
+        self.assertEqual(result["numberComponents"], 2)
+        self.assertEqual(result["coefficients"].shape, (11, 2))
+
+    def test_first_component_kept(self):
+        # A tolerance that every component fails still keeps the first component.
+        for criterion in ("yVariance", "validation"):
+            results = PLS.simpls.simpls_mem(self.XTrain, self.YTrain, 8, stoppingCriterion=criterion,
+                                            stoppingTolerance=2.0, validationData=self.validationData)
+            self.assertEqual(results[0].shape[1], 1)
+        result = PLS.main.pls(self.XTrain, self.YTrain, 8, stoppingCriterion="yVariance", stoppingTolerance=2.0)
+        self.assertEqual(result["numberComponents"], 1)
+        self.assertFalse(numpy.any(numpy.isnan(result["vip"])))
+
+    def test_invalid_criterion(self):
+        with self.assertRaises(ValueError):
+            PLS.early_stopping.EarlyStopping("unknown")
+        with self.assertRaises(ValueError):
+            PLS.early_stopping.EarlyStopping("validation")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,91 @@
+import numpy
+import os
+import PLS.file_cache
+import PLS.simpls
+import shutil
+import tempfile
+import unittest
+
+
+class FileStatisticsCacheTests(unittest.TestCase):
+    """Tests checking the cache of statistics of a saved X matrix."""
+
+    def setUp(self):
+        """Save an X matrix and create an empty cache."""
+
+        self.directory = tempfile.mkdtemp()
+        self.X = numpy.random.rand(30, 8)
+        self.X = self.X - self.X.mean(axis=0)
+        self.Y = numpy.random.rand(30, 2)
+        self.Y = self.Y - self.Y.mean(axis=0)
+        self.fileMatrix = os.path.join(self.directory, "X.txt")
+        self.fileMatrixTrans = os.path.join(self.directory, "XTranspose.txt")
+        numpy.savetxt(self.fileMatrix, self.X, delimiter='\t')
+        numpy.savetxt(self.fileMatrixTrans, self.X.T, delimiter='\t')
+        self.cacheDirectory = os.path.join(self.directory, "cache")
+
+    def tearDown(self):
+        """Remove temporary files used."""
+
+        shutil.rmtree(self.directory)
+
+    def test_statistics(self):
+        cache = PLS.file_cache.FileStatisticsCache(self.cacheDirectory)
+        for i in range(2):
+            # The second time round, the statistics come from the cache.
+            statistics = cache.statistics(self.fileMatrix)
+            self.assertEqual(statistics["numObservations"], 30)
+            self.assertEqual(statistics["numPredictors"], 8)
+            self.assertTrue(numpy.allclose(statistics["columnNorms"], numpy.linalg.norm(self.X, axis=0)))
+            self.assertTrue(numpy.allclose(statistics["gram"], (self.X.T).dot(self.X)))
+            with open(self.fileMatrix, 'rb') as readX:
+                readX.seek(statistics["rowOffsets"][17])
+                self.assertTrue(numpy.allclose(numpy.fromstring(readX.readline().decode(), sep='\t'), self.X[17]))
+            self.assertEqual(len(os.listdir(self.cacheDirectory)), 1)
+
+    def test_changed_file(self):
+        cache = PLS.file_cache.FileStatisticsCache(self.cacheDirectory, maxGramPredictors=4)
+        statistics = cache.statistics(self.fileMatrix)
+        self.assertIsNone(statistics["gram"])
+        self.assertIsNone(statistics["columnNorms"])
+        self.assertEqual(statistics["numPredictors"], 8)
+        numpy.savetxt(self.fileMatrix, self.X[:20], delimiter='\t')
+        self.assertEqual(cache.statistics(self.fileMatrix)["numObservations"], 20)
+
+    def test_empty_file(self):
+        fileEmpty = os.path.join(self.directory, "Empty.txt")
+        open(fileEmpty, 'w').close()
+        statistics = PLS.file_cache.FileStatisticsCache(self.cacheDirectory).statistics(fileEmpty)
+        self.assertEqual(statistics["numObservations"], 0)
+        self.assertEqual(statistics["numPredictors"], 0)
+
+    def test_eviction(self):
+        cache = PLS.file_cache.FileStatisticsCache(self.cacheDirectory)
+        cache.statistics(self.fileMatrix)
+        entrySize = sum(os.path.getsize(os.path.join(self.cacheDirectory, i)) for i in os.listdir(self.cacheDirectory))
+        cache.maxSize = entrySize
+        fileReversed = os.path.join(self.directory, "XReversed.txt")
+        numpy.savetxt(fileReversed, self.X[::-1], delimiter='\t')
+        cache.statistics(fileReversed)
+        self.assertEqual(os.listdir(self.cacheDirectory), ["{0:s}.npz".format(cache.fingerprint(fileReversed))])
+
+    def test_simpls_file(self):
+        memResults = PLS.simpls.simpls_mem(self.X, self.Y, 4)
+        for i in [2000, 4]:
+            # Run with and without the Gram matrix cached.
+            cache = PLS.file_cache.FileStatisticsCache(os.path.join(self.cacheDirectory, str(i)), maxGramPredictors=i)
+            for j in range(2):
+                fileResults = PLS.simpls.simpls_file(self.fileMatrix, self.fileMatrixTrans, self.Y, 4, cache=cache)
+                for k, l in zip(memResults, fileResults):
+                    self.assertTrue(numpy.allclose(k, l, rtol=0, atol=1e-10))
+
+    def test_simpls_file_sparse(self):
+        memResults = PLS.simpls.simpls_mem(self.X, self.Y, 4, 3, "topk")
+        cache = PLS.file_cache.FileStatisticsCache(self.cacheDirectory)
+        fileResults = PLS.simpls.simpls_file(self.fileMatrix, self.fileMatrixTrans, self.Y, 4, 3, "topk", cache=cache)
+        for i, j in zip(memResults, fileResults):
+            self.assertTrue(numpy.allclose(i, j, rtol=0, atol=1e-10))
+
+
+if __name__ == '__main__':
+    unittest.main()
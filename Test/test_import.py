@@ -0,0 +1,35 @@
+import json
+import subprocess
+import sys
+import unittest
+
+
+def modules_imported(code):
+    """Run code in a new interpreter and determine which numpy, scipy and PLS modules it imported."""
+
+    code += "\nimport json, sys\nprint(json.dumps(sorted(i for i in sys.modules if i.split('.')[0] in ('numpy', 'scipy', 'PLS'))))"
+    output = subprocess.check_output([sys.executable, "-c", code])
+    return json.loads(output.decode().strip().splitlines()[-1])
+
+
+class LazyImportTests(unittest.TestCase):
+    """Tests checking that importing the package for scoring only imports what scoring needs."""
+
+    def test_import_package(self):
+        modules = modules_imported("import PLS")
+        self.assertEqual(modules, ["PLS"])
+
+    def test_scoring(self):
+        modules = modules_imported("import numpy, PLS\nPLS.predict(numpy.ones((3, 2)), numpy.ones((4, 2)))\nPLS.load_model")
+        self.assertEqual([i for i in modules if not i.startswith("numpy")], ["PLS", "PLS.model_io"])
+
+    def test_submodules(self):
+        modules = modules_imported("import PLS\nPLS.simpls")
+        self.assertIn("PLS.simpls", modules)
+        self.assertIn("PLS.dot_product", modules)
+        with self.assertRaises(AttributeError):
+            __import__("PLS").missing_attribute
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,67 @@
+import numpy
+import os
+import PLS.output_arrays
+import PLS.simpls
+import shutil
+import tempfile
+import unittest
+
+
+class OutputArrayTests(unittest.TestCase):
+    """Tests checking the allocation of SIMPLS outputs."""
+
+    def test_in_memory(self):
+        output = PLS.output_arrays.output_array(4, 3)
+        self.assertIsInstance(output, numpy.matrix)
+        self.assertNotIsInstance(output.base, numpy.memmap)
+        self.assertTrue(numpy.array_equal(output, numpy.zeros((4, 3))))
+
+    def test_temporary_file(self):
+        output = PLS.output_arrays.output_array(4, 3, True)
+        self.assertIsInstance(output, numpy.matrix)
+        self.assertIsInstance(output.base, numpy.memmap)
+        self.assertTrue(output.flags.f_contiguous)
+        self.assertTrue(numpy.array_equal(output, numpy.zeros((4, 3))))
+        output[:, 1] = numpy.matrix([[1], [2], [3], [4]])
+        self.assertEqual(output.sum(), 10)
+
+    def test_directory(self):
+        outputDirectory = tempfile.mkdtemp()
+        output = PLS.output_arrays.output_array(4, 3, outputDirectory, "scores")
+        output[:, 2] = 1
+        output.base.flush()
+        saved = numpy.memmap(os.path.join(outputDirectory, "scores.dat"), dtype=numpy.float64, mode='r', shape=(4, 3), order='F')
+        self.assertTrue(numpy.array_equal(saved, output))
+        del output, saved
+        shutil.rmtree(outputDirectory)
+
+
+class MemoryMappedSIMPLSTests(unittest.TestCase):
+    """Tests checking SIMPLS run with memory-mapped outputs."""
+
+    def test_matches_in_memory(self):
+        X = numpy.random.rand(30, 8)
+        X = X - X.mean(axis=0)
+        Y = numpy.random.rand(30, 2)
+        Y = Y - Y.mean(axis=0)
+        memResults = PLS.simpls.simpls_mem(X, Y, 4)
+
+        mappedResults = PLS.simpls.simpls_mem(X, Y, 4, outputLocation=True)
+        for i, j in zip(memResults, mappedResults):
+            self.assertTrue(numpy.allclose(i, j, rtol=0, atol=1e-10))
+
+        outputDirectory = tempfile.mkdtemp()
+        fileMatrix = os.path.join(outputDirectory, "X.txt")
+        fileMatrixTrans = os.path.join(outputDirectory, "XTranspose.txt")
+        numpy.savetxt(fileMatrix, X, delimiter='\t')
+        numpy.savetxt(fileMatrixTrans, X.T, delimiter='\t')
+        mappedResults = PLS.simpls.simpls_file(fileMatrix, fileMatrixTrans, Y, 4, outputLocation=outputDirectory)
+        for i, j in zip(memResults, mappedResults):
+            self.assertTrue(numpy.allclose(i, j, rtol=0, atol=1e-10))
+        self.assertEqual(sorted(os.listdir(outputDirectory)), ["X.txt", "XTranspose.txt", "weights.dat", "xLoadings.dat", "xScores.dat", "yScores.dat"])
+        del mappedResults
+        shutil.rmtree(outputDirectory)
+
+
+if __name__ == '__main__':
+    unittest.main()
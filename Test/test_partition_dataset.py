@@ -1,6 +1,7 @@
 import numpy
 import PLS.partition_dataset
 import unittest
+import warnings
 
 
 class CompletionTests(unittest.TestCase):
@@ -18,19 +19,66 @@ class CompletionTests(unittest.TestCase):
 
     def test_too_many_folds(self):
         partition = PLS.partition_dataset.partition_dataset(self.ySmall, 4, False)
-        partition = PLS.partition_dataset.partition_dataset(self.ySmall, 4, True)
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter("always")
+            partition = PLS.partition_dataset.partition_dataset(self.ySmall, 4, True)
+        self.assertEqual(len(caught), 3)
+        self.assertEqual(partition.shape, (6,))
+        self.assertTrue(numpy.all((partition >= 0) & (partition < 4)))
+
+    def test_invalid_input(self):
+        with self.assertRaises(ValueError):
+            PLS.partition_dataset.partition_dataset(self.ySmall, 1)
+        with self.assertRaises(ValueError):
+            PLS.partition_dataset.partition_dataset(numpy.ones(6), 2, True)
+        with self.assertRaises(ValueError):
+            PLS.partition_dataset.partition_dataset(numpy.array([[1, 1], [0, 1]]), 2, True)
+        with self.assertRaises(ValueError):
+            PLS.partition_dataset.partition_dataset(self.ySmall, 2, groups=[0, 1])
 
     # Tests to add
-    # CV stratified and non-stratified
     # Larger matrices
-    # Y matrix with one class (PLS1)
 
 
 class CorrectnessTests(unittest.TestCase):
     """Tests checking the correctness of the output."""
 
-    pass
+    @classmethod
+    def setUpClass(cls):
+        """Setup inputs needed for tests in the class."""
+
+        cls.yPLS1 = numpy.repeat([3.0, 1.0, 2.0], [40, 25, 35])
+        cls.yPLS2 = numpy.eye(3)[numpy.repeat([0, 1, 2], [40, 25, 35])]
+
+    def test_balanced(self):
+        partition = PLS.partition_dataset.partition_dataset(self.yPLS1, 3, seed=0)
+        self.assertEqual(partition.dtype.kind, 'i')
+        self.assertEqual(sorted(numpy.bincount(partition)), [33, 33, 34])
+
+    def test_stratified(self):
+        for Y in [self.yPLS1, self.yPLS2]:
+            partition = PLS.partition_dataset.partition_dataset(Y, 5, True, seed=1)
+            self.assertLessEqual(numpy.ptp(numpy.bincount(partition)), 1)
+            for start, stop in [(0, 40), (40, 65), (65, 100)]:
+                self.assertLessEqual(numpy.ptp(numpy.bincount(partition[start:stop], minlength=5)), 1)
+
+    def test_reproducible(self):
+        first = PLS.partition_dataset.partition_dataset(self.yPLS1, 4, True, seed=7)
+        second = PLS.partition_dataset.partition_dataset(self.yPLS1, 4, True, seed=numpy.random.default_rng(7))
+        self.assertTrue(numpy.array_equal(first, second))
+
+    def test_repeats(self):
+        partition = PLS.partition_dataset.partition_dataset(self.yPLS1, 4, seed=3, repeats=5)
+        self.assertEqual(partition.shape, (5, 100))
+        self.assertFalse(numpy.array_equal(partition[0], partition[1]))
+
+    def test_groups(self):
+        groups = numpy.arange(100) // 4
+        partition = PLS.partition_dataset.partition_dataset(self.yPLS1, 5, seed=4, groups=groups)
+        for i in range(25):
+            self.assertEqual(len(set(partition[groups == i])), 1)
+        self.assertEqual(list(numpy.bincount(partition)), [20] * 5)
 
 
 if __name__ == '__main__':
-    unittest.main()
\ No newline at end of file
+    unittest.main()
@@ -0,0 +1,117 @@
+import json
+import numpy
+import os
+import PLS.model_io
+import PLS.serve
+from scipy import sparse
+import shutil
+import tempfile
+import threading
+import unittest
+import urllib.error
+import urllib.request
+
+
+class ScoringServerTests(unittest.TestCase):
+    """Tests checking the scoring server using a local client."""
+
+    @classmethod
+    def setUpClass(cls):
+        """Save models and start the server."""
+
+        cls.modelDirectory = tempfile.mkdtemp()
+        cls.denseCoefficients = numpy.random.rand(6, 2)
+        cls.sparseCoefficients = sparse.csr_matrix(numpy.random.rand(6, 1) * (numpy.random.rand(6, 1) > 0.5))
+        PLS.model_io.save_model(os.path.join(cls.modelDirectory, "dense.npz"), cls.denseCoefficients)
+        PLS.model_io.save_model(os.path.join(cls.modelDirectory, "sparse.npz"), cls.sparseCoefficients)
+
+        cls.server = PLS.serve.make_server(cls.modelDirectory, port=0, cacheCapacity=1, maxDelay=0.05)
+        cls.url = "http://127.0.0.1:{0:d}".format(cls.server.server_address[1])
+        cls.serverThread = threading.Thread(target=cls.server.serve_forever)
+        cls.serverThread.daemon = True
+        cls.serverThread.start()
+
+    @classmethod
+    def tearDownClass(cls):
+        """Stop the server and remove the models."""
+
+        cls.server.shutdown()
+        cls.server.server_close()
+        shutil.rmtree(cls.modelDirectory)
+
+    def test_dense_rows(self):
+        X = numpy.random.rand(3, 5)
+        predictions = PLS.serve.score(self.url, "dense", X.tolist())
+        self.assertTrue(numpy.allclose(predictions, X.dot(self.denseCoefficients[1:]) + self.denseCoefficients[0]))
+
+    def test_sparse_rows(self):
+        rows = [{"indices": [0, 3], "values": [1.5, -2.0]}, [1, 2, 3, 4, 5]]
+        X = numpy.array([[1.5, 0, 0, -2.0, 0], [1, 2, 3, 4, 5]])
+        expected = PLS.model_io.predict(self.sparseCoefficients, X)
+        self.assertTrue(numpy.allclose(PLS.serve.score(self.url, "sparse", rows), expected))
+        self.assertTrue(numpy.allclose(PLS.serve.score(self.url, "dense", rows), PLS.model_io.predict(self.denseCoefficients, X)))
+
+    def test_concurrent_requests_batched(self):
+        X = numpy.random.rand(20, 5)
+        predictions = [None] * 20
+
+        def client(i):
+            predictions[i] = PLS.serve.score(self.url, "dense", [X[i].tolist()])[0]
+
+        batchesBefore = self.server.batcher.stats()["batches"]
+        clients = [threading.Thread(target=client, args=(i,)) for i in range(20)]
+        for i in clients:
+            i.start()
+        for i in clients:
+            i.join()
+        self.assertTrue(numpy.allclose(predictions, X.dot(self.denseCoefficients[1:]) + self.denseCoefficients[0]))
+        self.assertLess(self.server.batcher.stats()["batches"] - batchesBefore, 20)
+
+    def test_errors(self):
+        with self.assertRaises(urllib.error.HTTPError) as context:
+            PLS.serve.score(self.url, "missing", [[1, 2, 3, 4, 5]])
+        self.assertEqual(context.exception.code, 404)
+        with self.assertRaises(urllib.error.HTTPError) as context:
+            PLS.serve.score(self.url, "dense", [[1, 2, 3]])
+        self.assertEqual(context.exception.code, 400)
+        for row in ({"indices": [7], "values": [1.0]}, {"indices": [0.5], "values": [1.0]},
+                    {"indices": [True], "values": [1.0]}, {"indices": [1, 1], "values": [1.0, 2.0]}, {"values": [1.0]}):
+            with self.assertRaises(urllib.error.HTTPError) as context:
+                PLS.serve.score(self.url, "dense", [row])
+            self.assertEqual(context.exception.code, 400)
+        for body in ({"rows": [[1, 2, 3, 4, 5]]}, {"model": "dense"}, [1, 2]):
+            request = urllib.request.Request(self.url + "/predict", data=json.dumps(body).encode(),
+                                             headers={"Content-Type": "application/json"})
+            with self.assertRaises(urllib.error.HTTPError) as context:
+                urllib.request.urlopen(request)
+            self.assertEqual(context.exception.code, 400)
+
+    def test_stats(self):
+        PLS.serve.score(self.url, "dense", [[1, 2, 3, 4, 5]])
+        with urllib.request.urlopen(self.url + "/stats") as response:
+            stats = json.loads(response.read())
+        self.assertGreater(stats["rows"], 0)
+        self.assertGreater(stats["batches"], 0)
+        self.assertGreater(stats["meanLatency"], 0)
+        self.assertGreater(stats["rowsPerSecond"], 0)
+
+
+class ModelIOTests(unittest.TestCase):
+    """Tests checking saving, loading and predicting with models."""
+
+    def test_round_trip(self):
+        directory = tempfile.mkdtemp()
+        for i in [numpy.matrix(numpy.random.rand(4, 2)), sparse.csr_matrix(numpy.eye(4, 2))]:
+            fileModel = os.path.join(directory, "model.npz")
+            PLS.model_io.save_model(fileModel, i)
+            coefficients = PLS.model_io.load_model(fileModel)
+            self.assertEqual(sparse.issparse(coefficients), sparse.issparse(i))
+            X = numpy.random.rand(5, 3)
+            expected = X.dot(numpy.asarray(sparse.csr_matrix(i).toarray())[1:]) + numpy.asarray(sparse.csr_matrix(i).toarray())[0]
+            self.assertTrue(numpy.allclose(PLS.model_io.predict(coefficients, X), expected))
+            self.assertTrue(numpy.allclose(PLS.model_io.predict(coefficients, sparse.csr_matrix(X)), expected))
+        shutil.rmtree(directory)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -17,7 +17,16 @@ class CompletionTests(unittest.TestCase):
 class CorrectnessTests(unittest.TestCase):
     """Tests checking the correctness of the output."""
 
-    pass
+    def test_y_loadings(self):
+        # The Y loadings are Y0'*T, including when there are more responses than predictors.
+        generator = numpy.random.default_rng(0)
+        for numPredictors, numResponses in ((6, 3), (2, 5)):
+            X = generator.random((30, numPredictors))
+            X = X - X.mean(axis=0)
+            Y = generator.random((30, numResponses))
+            Y = Y - Y.mean(axis=0)
+            xLoadings, yLoadings, xScores, yScores, weights = PLS.simpls.simpls_mem(X, Y, 2)
+            self.assertTrue(numpy.allclose(yLoadings, (Y.T).dot(xScores), rtol=0, atol=1e-10))
 
     # These will primarily involve performing SIMPLS through my code and checking against Matlab results
 
@@ -1,4 +1,5 @@
 import numpy
+import os
 import PLS.simpls
 from scipy import sparse
 import unittest
@@ -22,5 +23,30 @@ class CorrectnessTests(unittest.TestCase):
     # These will primarily involve performing SIMPLS through memory and the file system and checking the results
 
 
+class BatchCorrectnessTests(unittest.TestCase):
+    """Tests checking the batched PLS1 SIMPLS against running SIMPLS on each target separately."""
+
+    def test_matches_separate_fits(self):
+        X = numpy.random.rand(30, 10)
+        X = X - X.mean(axis=0)
+        Y = numpy.random.rand(30, 4)
+        Y = Y - Y.mean(axis=0)
+
+        fileMatrix = "TestMatrixBatch.txt"
+        fileMatrixTrans = "TestMatrixTransBatch.txt"
+        numpy.savetxt(fileMatrix, X, delimiter='\t')
+        numpy.savetxt(fileMatrixTrans, X.T, delimiter='\t')
+        batchResults = PLS.simpls.simpls_file_batch(fileMatrix, fileMatrixTrans, Y, 4)
+        os.remove(fileMatrix)
+        os.remove(fileMatrixTrans)
+
+        self.assertEqual(len(batchResults), 4)
+        for i in range(4):
+            separateResults = PLS.simpls.simpls_mem(X, Y[:, i], 4)
+            for j, k in zip(separateResults, batchResults[i]):
+                self.assertEqual(j.shape, k.shape)
+                self.assertTrue(numpy.allclose(j, k, rtol=0, atol=1e-10))
+
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,59 @@
+import numpy
+import os
+import PLS.shard_worker
+import PLS.simpls
+import unittest
+
+
+class CorrectnessTests(unittest.TestCase):
+    """Tests checking the sharded SIMPLS against the memory-based SIMPLS."""
+
+    @classmethod
+    def setUpClass(cls):
+        """Setup inputs needed for tests in the class."""
+
+        cls.X = numpy.random.rand(40, 8)
+        cls.X = cls.X - cls.X.mean(axis=0)
+        cls.Y = numpy.random.rand(40, 3)
+        cls.Y = cls.Y - cls.Y.mean(axis=0)
+
+        # Save X in three shards of differing sizes.
+        cls.shardFiles = ["TestShard0.txt", "TestShard1.txt", "TestShard2.txt"]
+        for i, j in zip(cls.shardFiles, numpy.split(cls.X, [13, 30])):
+            numpy.savetxt(i, j, delimiter='\t')
+
+    @classmethod
+    def tearDownClass(cls):
+        """Remove temporary files used."""
+
+        for i in cls.shardFiles:
+            os.remove(i)
+
+    def check_against_mem(self, Y, transport=None):
+        memResults = PLS.simpls.simpls_mem(self.X, Y, 5)
+        shardResults = PLS.simpls.simpls_sharded(self.shardFiles, Y, 5, transport)
+        for i, j in zip(memResults, shardResults):
+            self.assertTrue(numpy.allclose(i, j, rtol=0, atol=1e-10))
+
+    def test_pipe_transport(self):
+        self.check_against_mem(self.Y)
+        self.check_against_mem(self.Y[:, 0])
+
+    def test_serial_transport(self):
+        with PLS.shard_worker.SerialTransport(self.shardFiles) as transport:
+            self.check_against_mem(self.Y, transport)
+
+    def test_pipe_transport_errors(self):
+        with PLS.shard_worker.PipeTransport(self.shardFiles + ["MissingShard.txt"]) as transport:
+            self.assertRaises(OSError, transport.request, "shape")
+        with PLS.shard_worker.PipeTransport(self.shardFiles) as transport:
+            self.assertRaises(ValueError, transport.request, "unknown")
+            self.assertEqual(transport.request("shape")[0], (13, 8))
+
+    def test_scores_orthonormal(self):
+        xScores = PLS.simpls.simpls_sharded(self.shardFiles, self.Y, 5)[2]
+        self.assertTrue(numpy.allclose((xScores.T).dot(xScores), numpy.eye(5), rtol=0, atol=1e-10))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,76 @@
+import numpy
+import os
+import PLS.simpls
+import PLS.sparsify
+import unittest
+
+
+class SparsifyTests(unittest.TestCase):
+    """Tests checking the sparsification of weight vectors."""
+
+    def test_soft(self):
+        r = numpy.matrix([[0.5], [-0.1], [0.8], [-0.3]])
+        sparseR = PLS.sparsify.sparsify_weight(r, 0.25)
+        expected = numpy.matrix([[0.3], [0], [0.6], [-0.1]])
+        self.assertTrue(numpy.allclose(sparseR, expected / numpy.linalg.norm(expected)))
+
+    def test_topk(self):
+        r = numpy.matrix([[0.5], [-0.1], [0.8], [-0.3]])
+        sparseR = PLS.sparsify.sparsify_weight(r, 2, "topk")
+        expected = numpy.matrix([[0.5], [0], [0.8], [0]])
+        self.assertTrue(numpy.allclose(sparseR, expected / numpy.linalg.norm(expected)))
+
+    def test_unchanged(self):
+        r = numpy.matrix([[0.6], [-0.8]])
+        self.assertTrue(numpy.allclose(PLS.sparsify.sparsify_weight(r, None), r))
+        self.assertTrue(numpy.allclose(PLS.sparsify.sparsify_weight(r, 0), r))
+        self.assertTrue(numpy.allclose(PLS.sparsify.sparsify_weight(r, 5, "topk"), r))
+
+    def test_unknown_method(self):
+        with self.assertRaises(ValueError):
+            PLS.sparsify.sparsify_weight(numpy.matrix([[1.0]]), 1, "hard")
+
+    def test_invalid_sparsity(self):
+        r = numpy.matrix([[0.6], [-0.8]])
+        for sparsity in (1.0, -0.1):
+            self.assertRaises(ValueError, PLS.sparsify.sparsify_weight, r, sparsity)
+        for sparsity in (0, -1, 1.5):
+            self.assertRaises(ValueError, PLS.sparsify.sparsify_weight, r, sparsity, "topk")
+
+
+class SparseSIMPLSTests(unittest.TestCase):
+    """Tests checking SIMPLS run with sparse weights."""
+
+    @classmethod
+    def setUpClass(cls):
+        """Setup inputs needed for tests in the class."""
+
+        cls.X = numpy.random.rand(30, 12)
+        cls.X = cls.X - cls.X.mean(axis=0)
+        cls.Y = numpy.random.rand(30, 2)
+        cls.Y = cls.Y - cls.Y.mean(axis=0)
+
+    def test_topk_weights(self):
+        weights = PLS.simpls.simpls_mem(self.X, self.Y, 3, [2, 3, 4], "topk")[4]
+        self.assertEqual(numpy.count_nonzero(weights[:, 0]), 2)
+        self.assertLessEqual(numpy.count_nonzero(abs(weights).sum(axis=1)), 2 + 3 + 4)
+
+    def test_mem_and_file_agree(self):
+        fileMatrix = "TestMatrixSparse.txt"
+        fileMatrixTrans = "TestMatrixTransSparse.txt"
+        numpy.savetxt(fileMatrix, self.X, delimiter='\t')
+        numpy.savetxt(fileMatrixTrans, self.X.T, delimiter='\t')
+        memResults = PLS.simpls.simpls_mem(self.X, self.Y, 3, 0.3)
+        fileResults = PLS.simpls.simpls_file(fileMatrix, fileMatrixTrans, self.Y, 3, 0.3)
+        os.remove(fileMatrix)
+        os.remove(fileMatrixTrans)
+        for i, j in zip(memResults, fileResults):
+            self.assertTrue(numpy.allclose(i, j, rtol=0, atol=1e-10))
+
+    def test_scores_orthonormal(self):
+        xScores = PLS.simpls.simpls_mem(self.X, self.Y, 3, 0.3)[2]
+        self.assertTrue(numpy.allclose((xScores.T).dot(xScores), numpy.eye(3), rtol=0, atol=1e-10))
+
+
+if __name__ == '__main__':
+    unittest.main()